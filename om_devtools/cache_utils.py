@@ -0,0 +1,74 @@
+"""Functions to save and load data that is cached between sessions."""
+
+import os
+import pickle
+
+
+def cache_file_name(env_var, fname):
+    """
+    Return the name of a cache file in ~/.om_devtools.
+
+    Parameters
+    ----------
+    env_var : str
+        Name of the environment variable that can be used to set the cache file name.
+    fname : str
+        Base name of the cache file.
+
+    Returns
+    -------
+    str
+        The cache file name.
+    """
+    return os.environ.get(env_var, os.path.join(os.path.expanduser('~'), '.om_devtools', fname))
+
+
+def load_cache(fname):
+    """
+    Return the data pickled in the given cache file, or None if it can't be loaded.
+
+    Parameters
+    ----------
+    fname : str
+        Name of the cache file.
+
+    Returns
+    -------
+    object or None
+        The cached data.
+    """
+    try:
+        with open(fname, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def save_cache(fname, data):
+    """
+    Pickle data to the given cache file.
+
+    The data is written to a temporary file that then replaces the cache file, so other
+    processes never see a partially written cache.  Failing to write the cache isn't fatal.
+
+    Parameters
+    ----------
+    fname : str
+        Name of the cache file.
+    data : object
+        The data to be cached.
+
+    Returns
+    -------
+    bool
+        True if the cache was written.
+    """
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(fname)), exist_ok=True)
+        tmp = '%s.%d' % (fname, os.getpid())
+        with open(tmp, 'wb') as f:
+            pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, fname)
+    except OSError:
+        return False
+    return True
@@ -1,4 +1,3 @@
-
 """
 Setup functions for the 'openmdao cprof' command plugin.
 
@@ -6,9 +5,324 @@ This command runs the c profiler on the given file or test function.
 """
 import os
 import sys
-from openmdao.utils.file_utils import _load_and_exec
+import time
+import glob
+import pstats
+import inspect
+import unittest
+import importlib
+import importlib.util
+import traceback
+import multiprocessing
+from fnmatch import fnmatchcase
+from collections import defaultdict
+
+import numpy as np
+
+from openmdao.utils.file_utils import _load_and_exec, fname2mod_name, get_module_path
+from openmdao.utils.mpi import MPI
 from openmdao.devtools.debug import profiling
 
+from om_devtools.functionlocator import FunctionLocator, default_cache_file
+
+
+# component methods that are grouped by class in the class cost table
+_comp_methods = ('compute', 'compute_partials', 'compute_jacvec_product', 'apply_nonlinear',
+                 'solve_nonlinear', 'apply_linear', 'solve_linear', 'linearize')
+
+
+def merge_stats(fnames, outfile=None):
+    """
+    Combine the pstats data from the given files.
+
+    Parameters
+    ----------
+    fnames : list of str
+        Names of pstats files, e.g., one per MPI rank.
+    outfile : str or None
+        If not None, write the combined stats to this file.
+
+    Returns
+    -------
+    pstats.Stats
+        The combined stats.
+    """
+    stats = pstats.Stats(*fnames)
+    if outfile is not None:
+        stats.dump_stats(outfile)
+    return stats
+
+
+def display_rank_stats(fnames, limit=20, stream=sys.stdout):
+    """
+    Display the min, mean and max cumulative time of each function across pstats files.
+
+    Parameters
+    ----------
+    fnames : list of str
+        Names of pstats files, one per MPI rank.
+    limit : int
+        Maximum number of functions to display.
+    stream : file-like
+        Where the output will go.
+    """
+    rank_stats = [pstats.Stats(f).stats for f in fnames]
+    funcs = sorted(set().union(*rank_stats))
+    nranks = len(fnames)
+
+    # functions that aren't called on a given rank count as 0
+    cumtimes = np.zeros((len(funcs), nranks))
+    ncalls = np.zeros(len(funcs), dtype=int)
+    for rank, stats in enumerate(rank_stats):
+        for i, func in enumerate(funcs):
+            if func in stats:
+                cc, nc, tt, ct, callers = stats[func]
+                cumtimes[i, rank] = ct
+                ncalls[i] += nc
+
+    order = np.argsort(cumtimes.max(axis=1))[::-1]
+
+    title = "%d Functions With the Highest Cumulative Time on Any of %d Ranks" % (limit, nranks)
+    print(title, file=stream)
+    print('-' * len(title), file=stream)
+    template = "{0:>10} {1:>10} {2:>10} {3:>6} {4:>12}  {5}"
+    print(template.format('min (s)', 'mean (s)', 'max (s)', 'rank', 'ncalls', 'function'),
+          file=stream)
+    for i in order[:limit]:
+        row = cumtimes[i]
+        print(template.format('%.4f' % row.min(), '%.4f' % row.mean(), '%.4f' % row.max(),
+                              row.argmax(), ncalls[i], pstats.func_std_string(funcs[i])),
+              file=stream)
+
+
+def get_class_method_stats(stats, methods=_comp_methods, cache_file=None):
+    """
+    Aggregate pstats data by the class and name of the given methods.
+
+    The class is the one where the method is defined, found by parsing the method's source file,
+    so time spent in an inherited method is charged to the base class that defines it.  Class
+    names are qualified by their module so that classes with the same name in different modules
+    are kept separate.
+
+    Parameters
+    ----------
+    stats : pstats.Stats
+        The profile data.
+    methods : iter of str
+        Names of the methods to aggregate.
+    cache_file : str or None
+        If given, the FunctionLocator cache file used to avoid reparsing source files.
+
+    Returns
+    -------
+    list
+        Entries of the form (class_name, method, ncalls, tottime, cumtime) sorted by cumtime.
+    """
+    methods = set(methods)
+    modnames = {}
+    locator = FunctionLocator(cache_file=cache_file)
+    locator.process_files(set(fname for fname, _, funcname in stats.stats if funcname in methods))
+    table = defaultdict(lambda: [0, 0., 0.])
+
+    for (fname, lineno, funcname), (cc, nc, tt, ct, callers) in stats.stats.items():
+        if funcname not in methods or not os.path.isfile(fname):
+            continue
+        try:
+            fpath, _, _ = locator.find(fname, lineno)
+        except SyntaxError:
+            continue
+        if fpath is None or '.' not in fpath:  # not a method
+            continue
+        if fname not in modnames:
+            modnames[fname] = get_module_path(fname) or fname2mod_name(fname)
+        entry = table[modnames[fname] + '.' + fpath.rsplit('.', 1)[0], funcname]
+        entry[0] += nc
+        entry[1] += tt
+        entry[2] += ct
+
+    return sorted(((cname, meth, nc, tt, ct) for (cname, meth), (nc, tt, ct) in table.items()),
+                  key=lambda x: x[4], reverse=True)
+
+
+def display_class_method_stats(stats, limit=20, stream=sys.stdout, cache_file=None):
+    """
+    Display the time spent in component methods, aggregated by class and method.
+
+    Parameters
+    ----------
+    stats : pstats.Stats
+        The profile data.
+    limit : int
+        Maximum number of rows to display.
+    stream : file-like
+        Where the output will go.
+    cache_file : str or None
+        If given, the FunctionLocator cache file used to avoid reparsing source files.
+    """
+    table = get_class_method_stats(stats, cache_file=cache_file)
+
+    title = "%d Component Class Methods With the Highest Cumulative Time" % limit
+    print(title, file=stream)
+    print('-' * len(title), file=stream)
+    template = "{0:>10} {1:>10} {2:>12} {3:>10}  {4}"
+    print(template.format('total (s)', 'tottime (s)', 'per call (ms)', 'ncalls', 'method'),
+          file=stream)
+    for cname, meth, nc, tt, ct in table[:limit]:
+        print(template.format('%.4f' % ct, '%.4f' % tt, '%.4f' % (ct / nc * 1000.), nc,
+                              '%s.%s' % (cname, meth)), file=stream)
+
+
+def _has_magic(s):
+    return any(c in s for c in '*?[')
+
+
+def _iter_test_names(modpath):
+    """
+    Yield the names of TestCase methods and test functions defined in the given module.
+
+    Parameters
+    ----------
+    modpath : str
+        File name or dotted module path of a test module.
+
+    Yields
+    ------
+    str
+        Either <testcase>.<method> or <function>.
+    """
+    if modpath.endswith('.py'):
+        spec = importlib.util.spec_from_file_location(fname2mod_name(modpath), modpath)
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+    else:
+        mod = importlib.import_module(modpath)
+
+    loader = unittest.TestLoader()
+    for name, obj in inspect.getmembers(mod):
+        if getattr(obj, '__module__', None) != mod.__name__:
+            continue
+        if inspect.isclass(obj) and issubclass(obj, unittest.TestCase):
+            for meth in loader.getTestCaseNames(obj):
+                yield '%s.%s' % (name, meth)
+        elif inspect.isfunction(obj) and name.startswith('test'):
+            yield name
+
+
+def expand_test_specs(specs):
+    """
+    Expand glob patterns in the given script or test specs.
+
+    A test spec has the form <file_or_modpath>:<testcase>.<method> or <file_or_modpath>:<function>.
+    The file part may be a glob pattern, and the test part may be an fnmatch pattern that is
+    matched against the tests found in each file, e.g., 'test_*.py:*Case.test_*'.
+
+    Parameters
+    ----------
+    specs : list of str
+        Script names or test specs, possibly containing glob patterns.
+
+    Returns
+    -------
+    list of str
+        The expanded specs.
+    """
+    expanded = []
+    for spec in specs:
+        if ':' in spec and not os.path.isfile(spec):
+            fpart, tpart = spec.rsplit(':', 1)
+        else:
+            fpart, tpart = spec, None
+
+        files = sorted(glob.glob(fpart)) if _has_magic(fpart) else [fpart]
+        for fname in files:
+            if tpart is None:
+                expanded.append(fname)
+            elif _has_magic(tpart):
+                expanded.extend('%s:%s' % (fname, t) for t in _iter_test_names(fname)
+                                if fnmatchcase(t, tpart))
+            else:
+                expanded.append('%s:%s' % (fname, tpart))
+    return expanded
+
+
+def _spec2fname(spec):
+    """
+    Return a file name based on the given test spec.
+    """
+    return ''.join(c if c.isalnum() or c in '._-' else '_' for c in spec) + '.prof'
+
+
+def _cprof_worker(args):
+    """
+    Profile a single script or test in a worker process.
+
+    Parameters
+    ----------
+    args : tuple
+        The script or test spec, the name of the pstats output file and the args to be passed
+        to the script.
+
+    Returns
+    -------
+    tuple
+        The spec, the output file, the elapsed time and an error message or None.
+    """
+    spec, outfile, user_args = args
+    start = time.perf_counter()
+    err = None
+    try:
+        with profiling(outfile):
+            _load_and_exec(spec, list(user_args))
+    except BaseException:
+        err = traceback.format_exc()
+    return spec, outfile, time.perf_counter() - start, err
+
+
+def profile_parallel(specs, outfile, profdir, jobs=1, stream=sys.stdout, user_args=()):
+    """
+    Profile each script or test in its own process, then merge the results.
+
+    Parameters
+    ----------
+    specs : list of str
+        Script names or test specs.
+    outfile : str
+        Name of the file where the merged stats are written.
+    profdir : str
+        Directory where the stats for each spec are written.
+    jobs : int
+        Number of worker processes.
+    stream : file-like
+        Where the summary will go.
+    user_args : list of str
+        Args to be passed to each script.
+
+    Returns
+    -------
+    pstats.Stats or None
+        The merged stats, or None if no profiles completed.
+    """
+    os.makedirs(profdir, exist_ok=True)
+    work = [(spec, os.path.join(profdir, _spec2fname(spec)), user_args) for spec in specs]
+
+    results = []
+    # maxtasksperchild=1 so that each spec runs in a fresh process
+    with multiprocessing.Pool(processes=jobs, maxtasksperchild=1) as pool:
+        for spec, fname, elapsed, err in pool.imap_unordered(_cprof_worker, work):
+            status = 'ok' if err is None else 'FAILED'
+            print("%-6s %8.3f s  %s" % (status, elapsed, spec), file=stream, flush=True)
+            if err is not None:
+                print(err, file=stream)
+            results.append((spec, fname, elapsed, err))
+
+    # failed tests still have profile data up to the failure
+    fnames = [fname for _, fname, _, _ in results if os.path.isfile(fname)]
+    nfailed = sum(1 for r in results if r[3] is not None)
+    print("\n%d profiled, %d failed. Merged stats written to %s" %
+          (len(results), nfailed, outfile), file=stream)
+    if fnames:
+        return merge_stats(fnames, outfile)
+
 
 def _cprof_setup_parser(parser):
     """
@@ -19,9 +333,30 @@ def _cprof_setup_parser(parser):
     parser : argparse subparser
         The parser we're adding options to.
     """
-    parser.add_argument('file', nargs=1, help='Python script or test to profile.')
+    parser.add_argument('file', nargs='+', help='Python script(s) or test(s) to profile, or a '
+                        'pstats file to view when using --view. Scripts and tests may contain glob '
+                        'patterns, e.g., "test_*.py:*TestCase.test_*".')
     parser.add_argument('-o', default='prof.out', action='store', dest='outfile',
-                        help='Name of output file.  By default, output goes to prof.out')
+                        help='Name of output file.  By default, output goes to prof.out. '
+                        'Under MPI, each rank writes to <outfile>.<rank> and the combined stats '
+                        'are written to <outfile>.')
+    parser.add_argument('-l', '--limit', action='store', type=int, default=20, dest='limit',
+                        help='Limit the number of rows in the per rank and by class reports.')
+    parser.add_argument('-c', '--by_class', action='store_true', dest='by_class',
+                        help='Display time spent in component methods (compute, '
+                        'compute_partials, apply_nonlinear, solve_linear, linearize, ...) '
+                        'aggregated by class and method.')
+    parser.add_argument('-j', '--jobs', action='store', type=int, default=1, dest='jobs',
+                        help='Number of processes used to profile multiple scripts or tests. '
+                        'Each is profiled in its own process.')
+    parser.add_argument('--profdir', action='store', default='cprof_profiles', dest='profdir',
+                        help='Directory where stats for each script or test are written when '
+                        'profiling more than one. The merged stats are written to the output '
+                        'file.')
+    parser.add_argument('--view', action='store_true', dest='view',
+                        help='View the profile data in a browser.')
+    parser.add_argument('-p', '--port', action='store', dest='port', type=int, default=8009,
+                        help='Web server port used by --view.')
 
 
 def _cprof_exec(options, user_args):
@@ -35,8 +370,60 @@ def _cprof_exec(options, user_args):
     user_args : list of str
         Args to be passed to the user script.
     """
-    with profiling(options.outfile):
-        _load_and_exec(options.file[0], user_args)
+    fname = options.file[0]
+    if options.view and len(options.file) == 1 and not fname.endswith('.py') and \
+            os.path.isfile(fname):
+        # assume it's an existing pstats file
+        from om_devtools.statprof.viewcprof import view_cprof
+        view_cprof(fname, port=options.port)
+        return
+
+    specs = expand_test_specs(options.file)
+    if not specs:
+        print("No matching scripts or tests found.", file=sys.stderr)
+        sys.exit(-1)
+
+    if len(specs) > 1 or options.jobs > 1:
+        if MPI and MPI.COMM_WORLD.size > 1:
+            print("Profiling multiple scripts or tests isn't supported under MPI.",
+                  file=sys.stderr)
+            sys.exit(-1)
+        stats = profile_parallel(specs, options.outfile, options.profdir, jobs=options.jobs,
+                                 user_args=user_args)
+        if stats is None:
+            return
+        if options.by_class:
+            print('\n')
+            display_class_method_stats(stats, limit=options.limit,
+                                       cache_file=default_cache_file())
+    elif MPI and MPI.COMM_WORLD.size > 1:
+        comm = MPI.COMM_WORLD
+        fnames = ['%s.%d' % (options.outfile, rank) for rank in range(comm.size)]
+
+        with profiling(fnames[comm.rank]):
+            _load_and_exec(specs[0], user_args)
+
+        comm.barrier()
+        if comm.rank == 0:
+            stats = merge_stats(fnames, options.outfile)
+            display_rank_stats(fnames, limit=options.limit)
+            if options.by_class:
+                print('\n')
+                display_class_method_stats(stats, limit=options.limit,
+                                           cache_file=default_cache_file())
+        else:
+            return
+    else:
+        with profiling(options.outfile):
+            _load_and_exec(specs[0], user_args)
+
+        if options.by_class:
+            display_class_method_stats(pstats.Stats(options.outfile), limit=options.limit,
+                                       cache_file=default_cache_file())
+
+    if options.view:
+        from om_devtools.statprof.viewcprof import view_cprof
+        view_cprof(options.outfile, port=options.port)
 
 
 def _cprof_setup():
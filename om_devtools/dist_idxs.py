@@ -6,7 +6,9 @@ This command dumps the distributed indices of specified OpenMDAO vectors.
 """
 
 import sys
-from six.moves import zip_longest
+import json
+
+import numpy as np
 
 from openmdao.utils.hooks import _register_hook
 from openmdao.utils.file_utils import _load_and_exec
@@ -18,6 +20,269 @@ except ImportError:
         pass
 
 
+def _get_layout(g, type_):
+    """
+    Return the names, sizes and starting offsets of the variables in the given vector.
+
+    Offsets are computed with a cumulative sum over the (rank, variable) size array, so they
+    are ordered by rank and then by variable within each rank.
+
+    Parameters
+    ----------
+    g : <Group>
+        The Group owning the vector.
+    type_ : str
+        Either 'input' or 'output'.
+
+    Returns
+    -------
+    list of str
+        Absolute variable names.
+    ndarray
+        Boolean array that is True for each input sharing memory with its source.
+    ndarray
+        Sizes of each variable on each rank, with shape (nranks, nvars).
+    ndarray
+        Starting offset of each variable on each rank, with shape (nranks, nvars).
+    """
+    names = list(g._var_allprocs_abs2meta[type_])
+    sizes = np.array(g._var_sizes[type_])
+    shared = np.zeros(len(names), dtype=bool)
+
+    if type_ == 'input':
+        shares = getattr(g._inputs, '_shares_src_mem', None)
+        if shares is not None:
+            vmeta_loc = g._var_abs2meta['input']
+            for ivar, vname in enumerate(names):
+                if shares(vname):
+                    shared[ivar] = True
+                    sizes[:, ivar] = vmeta_loc[vname]['size'] if vname in vmeta_loc else 0
+
+    # sizes may be int32, but the total size of a large model may not fit in that
+    offsets = np.zeros(sizes.size, dtype=np.int64)
+    np.cumsum(sizes.ravel()[:-1], out=offsets[1:])
+
+    return names, shared, sizes, offsets.reshape(sizes.shape)
+
+
+class _LayoutLines(object):
+    """
+    Generate the (name, index) strings for the nonzero blocks of a vector on demand.
+
+    Attributes
+    ----------
+    names : list of str
+        Absolute variable names.
+    shared : ndarray
+        True for each input sharing memory with its source.
+    ranks : ndarray
+        Rank of each nonzero block.
+    ivars : ndarray
+        Variable index of each nonzero block.
+    starts : ndarray
+        Starting offset of each nonzero block.
+    ends : ndarray
+        Last index of each nonzero block.
+    full : bool
+        If True, the index string is the full range of indices instead of just the offset.
+    nwid : int
+        Width of the name column.
+    iwid : int
+        Width of the index column.
+    """
+
+    def __init__(self, layout, full):
+        self.names, self.shared, sizes, offsets = layout
+        self.ranks, self.ivars = np.nonzero(sizes)
+        self.starts = offsets[self.ranks, self.ivars]
+        self.ends = self.starts + sizes[self.ranks, self.ivars] - 1
+        self.full = full
+        self.nwid = max([len(n) + s for n, s in zip(self.names, self.shared)], default=0)
+        # offsets increase monotonically, so the last entry is the widest
+        self.iwid = len(self[len(self) - 1][1]) if len(self) > 0 else 0
+
+    def __len__(self):
+        return self.starts.size
+
+    def __getitem__(self, i):
+        ivar = self.ivars[i]
+        name = self.names[ivar] + '*' if self.shared[ivar] else self.names[ivar]
+        if self.full:
+            return name, '%d-%d' % (self.starts[i], self.ends[i])
+        return name, str(self.starts[i])
+
+
+class DistIdxsLayout(object):
+    """
+    Layout of the variables in the global input and output vectors of a model.
+
+    The layout can be saved to and loaded from a JSON or .npz file, and used to find which
+    variable and rank own a given global index, or the global index of a given variable entry.
+
+    Attributes
+    ----------
+    names : dict
+        List of absolute variable names keyed by 'input' or 'output'.
+    sizes : dict
+        Array of variable sizes with shape (nranks, nvars) keyed by 'input' or 'output'.
+    offsets : dict
+        Array of variable starting offsets with shape (nranks, nvars) keyed by 'input' or
+        'output'.
+    _blocks : dict
+        (ranks, ivars, starts) of the nonzero blocks, sorted by start, for each vector.
+    _name2idx : dict
+        Mapping of variable name to variable index for each vector.
+    """
+
+    def __init__(self, names, sizes, offsets):
+        self.names = names
+        self.sizes = sizes
+        self.offsets = offsets
+        self._blocks = {}
+        self._name2idx = {}
+        for io in ('input', 'output'):
+            ranks, ivars = np.nonzero(sizes[io])
+            # offsets increase in (rank, var) order, so starts are already sorted
+            self._blocks[io] = (ranks, ivars, offsets[io][ranks, ivars])
+            self._name2idx[io] = {n: i for i, n in enumerate(names[io])}
+
+    @classmethod
+    def from_problem(cls, problem):
+        """
+        Return the layout of the vectors of the given problem's model.
+
+        Parameters
+        ----------
+        problem : <Problem>
+            The problem object that contains the model.  It must have completed final_setup.
+
+        Returns
+        -------
+        DistIdxsLayout
+            The layout.
+        """
+        names = {}
+        sizes = {}
+        offsets = {}
+        for io in ('input', 'output'):
+            names[io], _, sizes[io], offsets[io] = _get_layout(problem.model, io)
+        return cls(names, sizes, offsets)
+
+    def save(self, fname):
+        """
+        Save the layout to a JSON file if fname ends with '.json', else to an .npz file.
+
+        Parameters
+        ----------
+        fname : str
+            Name of the file.
+        """
+        if fname.endswith('.json'):
+            with open(fname, 'w') as f:
+                json.dump({io: {'names': self.names[io], 'sizes': self.sizes[io].tolist(),
+                                'offsets': self.offsets[io].tolist()}
+                           for io in ('input', 'output')}, f)
+        else:
+            arrays = {}
+            for io in ('input', 'output'):
+                arrays[io + '_names'] = np.array(self.names[io], dtype=str)
+                arrays[io + '_sizes'] = self.sizes[io]
+                arrays[io + '_offsets'] = self.offsets[io]
+            with open(fname, 'wb') as f:
+                np.savez_compressed(f, **arrays)
+
+    @classmethod
+    def load(cls, fname):
+        """
+        Load a layout saved by the save method.
+
+        Parameters
+        ----------
+        fname : str
+            Name of the file.
+
+        Returns
+        -------
+        DistIdxsLayout
+            The layout.
+        """
+        names = {}
+        sizes = {}
+        offsets = {}
+        if fname.endswith('.json'):
+            with open(fname, 'r') as f:
+                data = json.load(f)
+            for io in ('input', 'output'):
+                names[io] = data[io]['names']
+                sizes[io] = np.array(data[io]['sizes'], dtype=int)
+                offsets[io] = np.array(data[io]['offsets'], dtype=int)
+        else:
+            with np.load(fname) as data:
+                for io in ('input', 'output'):
+                    names[io] = data[io + '_names'].tolist()
+                    sizes[io] = data[io + '_sizes']
+                    offsets[io] = data[io + '_offsets']
+        return cls(names, sizes, offsets)
+
+    def find(self, io, idx):
+        """
+        Return the variable, rank and local index that own the given global index.
+
+        Parameters
+        ----------
+        io : str
+            Either 'input' or 'output'.
+        idx : int
+            Index into the global vector.
+
+        Returns
+        -------
+        str
+            Absolute variable name.
+        int
+            Rank owning the entry.
+        int
+            Index of the entry within the variable on that rank.
+        """
+        ranks, ivars, starts = self._blocks[io]
+        k = np.searchsorted(starts, idx, side='right') - 1
+        if k < 0 or idx < 0:
+            raise IndexError("Index %d is out of range for the %s vector." % (idx, io))
+        rank = ranks[k]
+        ivar = ivars[k]
+        local = idx - starts[k]
+        if local >= self.sizes[io][rank, ivar]:
+            raise IndexError("Index %d is out of range for the %s vector." % (idx, io))
+        return self.names[io][ivar], int(rank), int(local)
+
+    def global_index(self, io, name, rank=0, local_idx=0):
+        """
+        Return the global index of an entry of the given variable on the given rank.
+
+        Parameters
+        ----------
+        io : str
+            Either 'input' or 'output'.
+        name : str
+            Absolute variable name.
+        rank : int
+            Rank owning the entry.
+        local_idx : int
+            Index of the entry within the variable on that rank.
+
+        Returns
+        -------
+        int
+            Index into the global vector.
+        """
+        ivar = self._name2idx[io][name]
+        size = self.sizes[io][rank, ivar]
+        if local_idx < 0 or local_idx >= size:
+            raise IndexError("Index %d is out of range for variable '%s' of size %d on "
+                             "rank %d." % (local_idx, name, size, rank))
+        return int(self.offsets[io][rank, ivar] + local_idx)
+
+
 def dump_dist_idxs(problem, full=False, stream=sys.stdout):
     """
     Print out the distributed idxs for each variable in input and output vecs.
@@ -36,73 +301,294 @@ def dump_dist_idxs(problem, full=False, stream=sys.stdout):
     C1.y      3      2 sub.C2.x
     P.x       0      0 C1.x
 
+    Lines are written as they are generated, so the full table is never held in memory.
+
     Parameters
     ----------
     problem : <Problem>
         The problem object that contains the model.
     full : bool
-        If True, include data for all indices instead of just offsets.
+        If True, show the range of indices of each variable instead of just its offset.
     stream : File-like
         Where dump output will go.
     """
-    def _get_data(g, type_):
-
-        sizes = g._var_sizes
-        vmeta = g._var_allprocs_abs2meta
-        vmeta_loc = g._var_abs2meta
-        abs2idx = g._var_allprocs_abs2idx
-
-        try:
-            if type_ == 'input':
-                shares = g._inputs._shares_src_mem
-            else:
-                shares = lambda x: False
-        except AttributeError:
-            shares = lambda x: False
-
-        data = []
-        nwid = 0
-        iwid = 0
-        total = 0
-        for rank in range(g.comm.size):
-            for ivar, vname in enumerate(vmeta[type_]):
-                if shares(vname):
-                    sz = vmeta_loc['input'][vname]['size'] if vname in vmeta_loc['input'] else 0
-                    suffix = '*'
-                else:
-                    sz = sizes[type_][rank, ivar]
-                    suffix = ''
-                if sz > 0:
-                    if full:
-                        data.extend((vname + suffix, str(total + i)) for i in range(sz))
-                    else:
-                        data.append((vname + suffix, str(total)))
-                nwid = max(nwid, len(vname + suffix))
-                iwid = max(iwid, len(data[-1][1]))
-                total += sz
-
-        return data, nwid, iwid
-
     def _dump(g, stream):
-
-        pdata, pnwid, piwid = _get_data(g, 'input')
-        udata, unwid, uiwid = _get_data(g, 'output')
-
-        data = []
-        for u, p in zip_longest(udata, pdata, fillvalue=('', '')):
-            data.append((u[0], u[1], p[1], p[0]))
+        plines = _LayoutLines(_get_layout(g, 'input'), full)
+        ulines = _LayoutLines(_get_layout(g, 'output'), full)
+        nu = len(ulines)
+        np_ = len(plines)
+        blank = ('', '')
 
         template = "{0:<{wid0}} {1:>{wid1}}     {2:>{wid2}} {3:<{wid3}}\n"
-        for d in data[::-1]:
-            stream.write(template.format(d[0], d[1], d[2], d[3],
-                                         wid0=unwid, wid1=uiwid,
-                                         wid2=piwid, wid3=pnwid))
+        for i in range(max(nu, np_) - 1, -1, -1):
+            u = ulines[i] if i < nu else blank
+            p = plines[i] if i < np_ else blank
+            stream.write(template.format(u[0], u[1], p[1], p[0],
+                                         wid0=ulines.nwid, wid1=ulines.iwid,
+                                         wid2=plines.iwid, wid3=plines.nwid))
         stream.write("\n\n")
 
     if not MPI or MPI.COMM_WORLD.rank == 0:
         _dump(problem.model, stream)
 
 
+def _get_src_indices(model, conn_graph, abs_in):
+    """
+    Return the flat source indices of the given input, or None if it has none.
+
+    Parameters
+    ----------
+    model : <Group>
+        The top level Group.
+    conn_graph : object or None
+        The model's connection graph, if this version of OpenMDAO has one.
+    abs_in : str
+        Absolute name of a local input.
+
+    Returns
+    -------
+    ndarray or None
+        Flat indices into the source.  These are global for distributed sources.
+    """
+    if conn_graph is not None:
+        return conn_graph.get_src_index_array(abs_in)
+
+    meta_in = model._var_abs2meta['input'][abs_in]
+    src_indices = meta_in.get('src_indices')
+    if src_indices is None:
+        return None
+    if hasattr(src_indices, 'shaped_array'):  # an Indexer
+        return src_indices.shaped_array(flat=True)
+
+    src_indices = np.asarray(src_indices)
+    src_shape = model._var_allprocs_abs2meta['output'][model._conn_global_abs_in2out[abs_in]]
+    src_shape = src_shape.get('global_shape', src_shape['shape'])
+    if not meta_in.get('flat_src_indices') and len(src_shape) > 1:
+        src_indices = np.ravel_multi_index(tuple(src_indices.reshape((-1, len(src_shape))).T),
+                                           src_shape)
+    return src_indices.ravel()
+
+
+def get_transfer_data(problem):
+    """
+    Return the number of bytes moved between ranks by a full transfer of the model's inputs.
+
+    A full transfer happens once per run_model for a model with a RunOnce solver, and once
+    per iteration otherwise.  A serial source is assumed to be sent from the lowest rank that
+    owns it whenever it isn't local.  Under MPI this must be called on all ranks.
+
+    Parameters
+    ----------
+    problem : <Problem>
+        The problem object that contains the model.  It must have completed final_setup.
+
+    Returns
+    -------
+    ndarray
+        Array with shape (nranks, nranks) where entry [i, j] is the number of bytes sent from
+        rank i to rank j.
+    dict
+        Number of bytes moved between different ranks keyed on (abs_out, abs_in).
+    """
+    model = problem.model
+    comm = model.comm
+    nranks = comm.size
+    myrank = comm.rank
+    itemsize = model._outputs._data.real.itemsize
+
+    out2idx = {n: i for i, n in enumerate(model._var_allprocs_abs2meta['output'])}
+    in2idx = {n: i for i, n in enumerate(model._var_allprocs_abs2meta['input'])}
+    out_sizes = model._var_sizes['output']
+    in_sizes = model._var_sizes['input']
+    allmeta_out = model._var_allprocs_abs2meta['output']
+    allmeta_in = model._var_allprocs_abs2meta['input']
+    local_ins = model._var_abs2meta['input']
+    conn_graph = model.get_conn_graph() if hasattr(model, 'get_conn_graph') else None
+
+    recv = np.zeros(nranks, dtype=int)
+    conn_bytes = {}
+    for abs_in, abs_out in model._conn_global_abs_in2out.items():
+        # skip discrete variables and inputs that aren't local
+        if abs_in not in local_ins or abs_out not in out2idx:
+            continue
+        iin = in2idx[abs_in]
+        in_size = in_sizes[myrank, iin]
+        if in_size == 0:
+            continue
+
+        src_sizes = out_sizes[:, out2idx[abs_out]]
+        if allmeta_out[abs_out].get('distributed', False):
+            src_indices = _get_src_indices(model, conn_graph, abs_in)
+            if src_indices is None:
+                if allmeta_in[abs_in].get('distributed', False):
+                    # the input gets the block of the source matching its own block
+                    start = np.sum(in_sizes[:myrank, iin])
+                    src_indices = np.arange(start, start + in_size)
+                else:
+                    src_indices = np.arange(in_size)
+            owners = np.searchsorted(np.cumsum(src_sizes), src_indices, side='right')
+            counts = np.bincount(owners, minlength=nranks)[:nranks]
+        else:
+            counts = np.zeros(nranks, dtype=int)
+            owner = myrank if src_sizes[myrank] > 0 else np.nonzero(src_sizes)[0][0]
+            counts[owner] = in_size
+
+        recv += counts
+        remote = int(np.sum(counts) - counts[myrank]) * itemsize
+        if remote > 0:
+            conn_bytes[abs_out, abs_in] = remote
+
+    recv *= itemsize
+
+    if nranks > 1:
+        # row j of the gathered array holds what rank j received from each rank
+        matrix = np.array(comm.allgather(recv)).T
+        all_conn_bytes = {}
+        for cb in comm.allgather(conn_bytes):
+            for key, nbytes in cb.items():
+                all_conn_bytes[key] = all_conn_bytes.get(key, 0) + nbytes
+        conn_bytes = all_conn_bytes
+    else:
+        matrix = recv.reshape((1, 1))
+
+    return matrix, conn_bytes
+
+
+def dump_transfer_report(problem, limit=20, stream=sys.stdout):
+    """
+    Print the bytes moved between ranks by a full transfer of the model's inputs.
+
+    Under MPI this must be called on all ranks, but only rank 0 prints.
+
+    Parameters
+    ----------
+    problem : <Problem>
+        The problem object that contains the model.  It must have completed final_setup.
+    limit : int
+        Maximum number of connections to display.
+    stream : File-like
+        Where dump output will go.
+    """
+    matrix, conn_bytes = get_transfer_data(problem)
+
+    if MPI and MPI.COMM_WORLD.rank != 0:
+        return
+
+    nranks = matrix.shape[0]
+    wid = max(10, len(str(np.max(matrix))) + 1)
+
+    title = "Bytes Sent From Rank (row) To Rank (column) Per Full Transfer"
+    print(title, file=stream)
+    print('-' * len(title), file=stream)
+    print('{:>6}'.format('') + ''.join('{:>{w}}'.format(j, w=wid) for j in range(nranks)),
+          file=stream)
+    for i in range(nranks):
+        print('{:>6}'.format(i) + ''.join('{:>{w}}'.format(b, w=wid) for b in matrix[i]),
+              file=stream)
+
+    offdiag = matrix - np.diag(np.diag(matrix))
+    title = "Inter-rank Bytes Per Rank"
+    print("\n\n%s" % title, file=stream)
+    print('-' * len(title), file=stream)
+    print("{:>6} {:>14} {:>14}".format('Rank', 'Sent', 'Received'), file=stream)
+    for i, (sent, received) in enumerate(zip(np.sum(offdiag, axis=1), np.sum(offdiag, axis=0))):
+        print("{:>6} {:>14} {:>14}".format(i, sent, received), file=stream)
+    print("\nTotal inter-rank bytes: %d" % np.sum(offdiag), file=stream)
+
+    if conn_bytes:
+        top = sorted(conn_bytes.items(), key=lambda x: x[1], reverse=True)[:limit]
+        title = "%d Connections With the Most Inter-rank Traffic" % len(top)
+        print("\n\n%s" % title, file=stream)
+        print('-' * len(title), file=stream)
+        for (abs_out, abs_in), nbytes in top:
+            print("{:>14}  {} -> {}".format(nbytes, abs_out, abs_in), file=stream)
+
+
+def get_balance_data(group, limit=10):
+    """
+    Return per-rank local sizes of the inputs and outputs of the given Group.
+
+    Parameters
+    ----------
+    group : <Group>
+        The Group.  It must have completed final_setup.
+    limit : int
+        Maximum number of variables to return from the most loaded rank.
+
+    Returns
+    -------
+    dict
+        Keyed by 'input' and 'output', each entry holds the per-rank 'totals', the
+        'imbalance' ratio of the largest total to the mean, the most loaded 'rank' and the
+        'largest' (name, size) variables on that rank.
+    """
+    data = {}
+    for io in ('input', 'output'):
+        sizes = group._var_sizes[io]
+        totals = np.sum(sizes, axis=1, dtype=np.int64)
+        mean = np.mean(totals) if totals.size > 0 else 0.
+        rank = int(np.argmax(totals)) if totals.size > 0 else 0
+        largest = []
+        if sizes.size > 0:
+            rank_sizes = sizes[rank]
+            names = list(group._var_allprocs_abs2meta[io])
+            # only sort the top entries
+            top = np.argpartition(rank_sizes, -limit)[-limit:] if rank_sizes.size > limit \
+                else np.arange(rank_sizes.size)
+            largest = [(names[i], int(rank_sizes[i]))
+                       for i in top[np.argsort(rank_sizes[top])[::-1]] if rank_sizes[i] > 0]
+        data[io] = {
+            'totals': totals,
+            'imbalance': float(np.max(totals) / mean) if mean > 0 else 1.,
+            'rank': rank,
+            'largest': largest,
+        }
+    return data
+
+
+def dump_balance_report(problem, limit=10, par_groups=False, stream=sys.stdout):
+    """
+    Print the per-rank local sizes of the inputs and outputs of the model.
+
+    Parameters
+    ----------
+    problem : <Problem>
+        The problem object that contains the model.  It must have completed final_setup.
+    limit : int
+        Maximum number of variables to display from the most loaded rank.
+    par_groups : bool
+        If True, also report on each ParallelGroup that is local to rank 0.
+    stream : File-like
+        Where dump output will go.
+    """
+    if MPI and MPI.COMM_WORLD.rank != 0:
+        return
+
+    groups = [problem.model]
+    if par_groups:
+        from openmdao.core.parallel_group import ParallelGroup
+        groups.extend(problem.model.system_iter(recurse=True, typ=ParallelGroup))
+
+    for group in groups:
+        data = get_balance_data(group, limit)
+        title = "Load Balance for %s (%d procs)" % (group.msginfo, group.comm.size)
+        print(title, file=stream)
+        print('-' * len(title), file=stream)
+        print("{:>6} {:>14} {:>14}".format('Rank', 'Outputs', 'Inputs'), file=stream)
+        for rank, (nout, nin) in enumerate(zip(data['output']['totals'],
+                                               data['input']['totals'])):
+            print("{:>6} {:>14} {:>14}".format(rank, nout, nin), file=stream)
+        for io in ('output', 'input'):
+            d = data[io]
+            print("\n%s imbalance (max / mean): %.3f" % (io.capitalize(), d['imbalance']),
+                  file=stream)
+            if d['largest']:
+                print("Largest %ss on rank %d:" % (io, d['rank']), file=stream)
+                for name, size in d['largest']:
+                    print("{:>14}  {}".format(size, name), file=stream)
+        print("\n", file=stream)
+
+
 def _dist_idxs_setup_parser(parser):
     """
     Set up the openmdao subparser for the 'openmdao dump_idxs' command.
@@ -113,11 +599,31 @@ def _dist_idxs_setup_parser(parser):
         The parser we're adding options to.
     """
     parser.add_argument(
-        'file', nargs=1, help='Python file containing the model.')
+        'file', nargs=1, help='Python file containing the model, or a layout file saved with '
+        '--layout to view when using --view.')
     parser.add_argument('-o', default=None, action='store', dest='outfile',
                         help='Name of output file.  By default, output goes to stdout.')
     parser.add_argument('-f', '--full', action='store_true', dest='full',
-                        help="Show all indices instead of just offsets.")
+                        help="Show the range of indices of each variable instead of just offsets.")
+    parser.add_argument('--layout', default=None, action='store', dest='layout',
+                        help="Also save the vector layout to the given file, which can be loaded "
+                        "with DistIdxsLayout.load.  It's saved as JSON if the file ends with "
+                        "'.json' and as a numpy .npz file otherwise.")
+    parser.add_argument('-t', '--transfers', action='store_true', dest='transfers',
+                        help="Instead of the indices, show the bytes moved between ranks when "
+                        "transferring inputs and the connections that move the most.")
+    parser.add_argument('-b', '--balance', action='store_true', dest='balance',
+                        help="Instead of the indices, show the local input and output sizes on "
+                        "each rank and the largest variables on the most loaded rank.")
+    parser.add_argument('--par_groups', action='store_true', dest='par_groups',
+                        help="With --balance, also report on each ParallelGroup.")
+    parser.add_argument('-l', '--limit', action='store', type=int, default=20, dest='limit',
+                        help='Limit the number of connections shown with --transfers or '
+                        'variables shown with --balance.')
+    parser.add_argument('--view', action='store_true', dest='view',
+                        help='View the vector layout in a browser.')
+    parser.add_argument('-p', '--port', action='store', dest='port', type=int, default=8009,
+                        help='Web server port used by --view.')
 
 
 def _dist_idxs_exec(options, user_args):
@@ -131,19 +637,41 @@ def _dist_idxs_exec(options, user_args):
     user_args : list of str
         Args to be passed to the user script.
     """
+    fname = options.file[0]
+    if options.view and fname.endswith(('.json', '.npz')):
+        from om_devtools.statprof.viewdistidxs import view_dist_idxs
+        view_dist_idxs(DistIdxsLayout.load(fname), title=fname, port=options.port)
+        return
+
     if options.outfile is None:
         out = sys.stdout
     else:
         out = open(options.outfile, 'w')
 
     def _dumpdist(prob):
-        dump_dist_idxs(prob, full=options.full, stream=out)
+        if options.layout and (not MPI or MPI.COMM_WORLD.rank == 0):
+            DistIdxsLayout.from_problem(prob).save(options.layout)
+
+        if options.view:
+            if not MPI or MPI.COMM_WORLD.rank == 0:
+                from om_devtools.statprof.viewdistidxs import view_dist_idxs
+                view_dist_idxs(DistIdxsLayout.from_problem(prob), title=fname,
+                               port=options.port)
+            exit()
+
+        if options.transfers:
+            dump_transfer_report(prob, limit=options.limit, stream=out)
+        elif options.balance:
+            dump_balance_report(prob, limit=options.limit, par_groups=options.par_groups,
+                                stream=out)
+        else:
+            dump_dist_idxs(prob, full=options.full, stream=out)
         exit()
 
     _register_hook('final_setup', 'Problem', post=_dumpdist)
 
     ignore_errors(True)
-    _load_and_exec(options.file[0], user_args)
+    _load_and_exec(fname, user_args)
 
 
 def _dist_idxs_setup():
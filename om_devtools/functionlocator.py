@@ -1,70 +1,280 @@
 
+import os
 import sys
 import ast
+import multiprocessing
+from bisect import bisect_right
+
+from om_devtools.cache_utils import cache_file_name, load_cache, save_cache
+
+
+def default_cache_file():
+    """
+    Return the name of the FunctionLocator cache file shared by profiling sessions.
+
+    It can be set using the OM_DEVTOOLS_FUNCLOC_CACHE environment variable.
+    """
+    return cache_file_name('OM_DEVTOOLS_FUNCLOC_CACHE', 'functionlocator.cache')
+
+
+def _file_key(fname):
+    st = os.stat(fname)
+    return (st.st_size, st.st_mtime)
+
+
+def _parse_ranges(fname):
+    """
+    Return (fname, key, ranges) for the given file, or (fname, None, None) if it can't be parsed.
+    """
+    try:
+        key = _file_key(fname)
+        return (fname, key, FunctionLocator()._parse(fname))
+    except (OSError, SyntaxError, ValueError, UnicodeDecodeError):
+        return (fname, None, None)
 
 
 class FunctionLocator(ast.NodeVisitor):
     """
-    An ast.NodeVisitor that records starting and ending lines of functions.
+    An ast.NodeVisitor that records starting and ending lines of functions and classes.
+
+    For each processed file, an interval index is built that maps any line to its innermost
+    enclosing function or class with a binary search.
+
+    If a cache file is given, the function ranges of each file are saved there, keyed on the
+    path, size and modification time of the file, so they can be reused by later sessions.
+
+    Attributes
+    ----------
+    funct_ranges : dict
+        For each processed file, a dict mapping the starting line of each function or class
+        to [dotted_name, last_line].
+    stack : list of str
+        Names of the classes and functions enclosing the node being visited.
+    seen : set
+        Names of the files that have been processed.
+    _ranges : list
+        (start, end, dotted_name) of each function or class in the file being processed.
+    _index : dict
+        For each processed file, a tuple of (segment starts, owning range of each segment,
+        ranges).  Lines with no enclosing function or class are owned by range -1.
+    _last_file : str or None
+        Name of the most recently processed file.
+    _cache_file : str or None
+        Name of the file where function ranges are persisted.
+    _cache : dict
+        Entries of the form abs_fname: (key, ranges) loaded from or to be saved to the cache.
+    _cache_dirty : bool
+        True if the cache has entries that haven't been saved.
     """
 
-    def __init__(self):
+    def __init__(self, cache_file=None):
         super(FunctionLocator, self).__init__()
         self.funct_ranges = {}
         self.stack = []
-        self.fstack = []
         self.seen = set()
+        self._ranges = []
+        self._index = {}
+        self._last_file = None
+        self._cache_file = cache_file
+        self._cache = (load_cache(cache_file) or {}) if cache_file else {}
+        self._cache_dirty = False
 
-    def generic_visit(self, node):
-        if self.fstack:
-            if hasattr(node, 'lineno'):
-                # update the last line of every funct on the stack
-                for f in self.fstack:
-                    f[1] = node.lineno
-
-        super(FunctionLocator, self).generic_visit(node)
+    def save_cache(self):
+        """
+        Save new function ranges to the cache file, merged with any saved by other sessions.
+        """
+        if not self._cache_file or not self._cache_dirty:
+            return
 
-    def visit_ClassDef(self, node):
-        self.stack.append(node.name)
-        for bnode in node.body:
-            self.visit(bnode)
-        self.stack.pop()
+        cache = load_cache(self._cache_file) or {}
+        cache.update(self._cache)
+        if save_cache(self._cache_file, cache):
+            self._cache_dirty = False
 
-    def visit_FunctionDef(self, node):
+    def _add_range(self, node):
         if self.stack:
-            parent = '.'.join(self.stack) + '.'
+            fpath = '.'.join(self.stack) + '.' + node.name
         else:
-            parent = ''
-        fpath = parent + node.name
+            fpath = node.name
 
-        finfo = [fpath, node.lineno]
-        self.funct_ranges[node.lineno] = finfo
+        # code objects report the first decorator line as their first line
+        start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+        end = getattr(node, 'end_lineno', None)
+        if end is None:  # python < 3.8
+            end = max(getattr(n, 'lineno', start) for n in ast.walk(node))
+        self._ranges.append((start, end, fpath))
 
         self.stack.append(node.name)
-        self.fstack.append(finfo)
-        for bnode in node.body:
-            self.visit(bnode)
+        self.generic_visit(node)
         self.stack.pop()
-        self.fstack.pop()
 
-    def process_file(self, fname):
-        if fname in self.seen:
-            return
+    visit_ClassDef = _add_range
+    visit_FunctionDef = _add_range
+    visit_AsyncFunctionDef = _add_range
 
-        self.seen.add(fname)
+    def _build_index(self, ranges):
+        """
+        Return the starting line and owning range of each segment of the file.
+
+        Ranges are properly nested, so a sweep over them sorted by start (outermost first)
+        splits the file into segments that are each owned by a single innermost range.
+        """
+        order = sorted(range(len(ranges)), key=lambda i: (ranges[i][0], -ranges[i][1]))
+        starts = []
+        owners = []
+
+        def _emit(line, owner):
+            if starts and starts[-1] == line:
+                owners[-1] = owner
+            else:
+                starts.append(line)
+                owners.append(owner)
+
+        stack = []
+        for i in order:
+            start = ranges[i][0]
+            while stack and ranges[stack[-1]][1] < start:
+                end = ranges[stack.pop()][1]
+                _emit(end + 1, stack[-1] if stack else -1)
+            stack.append(i)
+            _emit(start, i)
+
+        while stack:
+            end = ranges[stack.pop()][1]
+            _emit(end + 1, stack[-1] if stack else -1)
+
+        return starts, owners, ranges
 
+    def _parse(self, fname):
+        """
+        Return the (start, end, dotted_name) ranges of the functions and classes in a file.
+        """
         with open(fname, 'r') as f:
             self.stack = []
-            self.fstack = []
+            self._ranges = []
             node = ast.parse(f.read(), filename=fname, mode='exec')
             self.visit(node)
+        ranges = self._ranges
+        self._ranges = []
+        return ranges
+
+    def _set_ranges(self, fname, ranges):
+        self.seen.add(fname)
+        self.funct_ranges[fname] = {start: [fpath, end] for start, end, fpath in ranges}
+        self._index[fname] = self._build_index(ranges)
+
+    def _get_cached(self, fname):
+        """
+        Return the cached ranges for the given file if they are still valid, else None.
+        """
+        entry = self._cache.get(os.path.abspath(fname))
+        if entry is not None:
+            try:
+                if entry[0] == _file_key(fname):
+                    return entry[1]
+            except OSError:
+                pass
+        return None
+
+    def process_file(self, fname):
+        self._last_file = fname
+        if fname in self.seen:
+            return
+
+        ranges = self._get_cached(fname)
+        if ranges is not None:
+            self._set_ranges(fname, ranges)
+            return
+
+        # if parsing fails, the file will be treated as having no functions from now on
+        self._set_ranges(fname, [])
 
-    def get_funct_last_line(self, lineno):
+        key = _file_key(fname)
+        ranges = self._parse(fname)
+        self._set_ranges(fname, ranges)
+        if self._cache_file:
+            self._cache[os.path.abspath(fname)] = (key, ranges)
+            self._cache_dirty = True
+
+    def process_files(self, fnames, jobs=None):
+        """
+        Process the given files up front, parsing any that aren't cached in a process pool.
+
+        Files that don't exist or can't be parsed are treated as having no functions.  New
+        ranges are saved to the cache file, if any.
+
+        Parameters
+        ----------
+        fnames : iter of str
+            Names of the source files.
+        jobs : int or None
+            Number of processes used for parsing.  Defaults to the number of CPUs.
+        """
+        todo = []
+        for fname in fnames:
+            if fname in self.seen or fname.startswith('<') or not os.path.isfile(fname):
+                continue
+            ranges = self._get_cached(fname)
+            if ranges is None:
+                todo.append(fname)
+            else:
+                self._set_ranges(fname, ranges)
+
+        if len(todo) > 4 and jobs != 1:
+            with multiprocessing.Pool(jobs) as pool:
+                results = pool.map(_parse_ranges, todo, chunksize=4)
+        else:
+            results = [_parse_ranges(fname) for fname in todo]
+
+        for fname, key, ranges in results:
+            if ranges is None:
+                self._set_ranges(fname, [])
+            else:
+                self._set_ranges(fname, ranges)
+                if self._cache_file:
+                    self._cache[os.path.abspath(fname)] = (key, ranges)
+                    self._cache_dirty = True
+
+        self.save_cache()
+
+    def find(self, fname, lineno):
+        """
+        Return the innermost function or class enclosing the given line of the given file.
+
+        The file is processed first if necessary.
+
+        Parameters
+        ----------
+        fname : str
+            Name of the source file.
+        lineno : int
+            Line number.
+
+        Returns
+        -------
+        tuple
+            (dotted_name, start, end) of the enclosing function or class, or
+            (None, None, None) if the line isn't inside of one.
+        """
+        if fname not in self._index:
+            self.process_file(fname)
+        starts, owners, ranges = self._index[fname]
+        k = bisect_right(starts, lineno) - 1
+        if k < 0 or owners[k] < 0:
+            return (None, None, None)
+        start, end, fpath = ranges[owners[k]]
+        return (fpath, start, end)
+
+    def get_funct_last_line(self, lineno, fname=None):
         """
         Given a starting line number, return the function name and ending line number.
+
+        If fname is not given, the most recently processed file is used.
         """
+        if fname is None:
+            fname = self._last_file
         try:
-            return self.funct_ranges[lineno]
+            return self.funct_ranges[fname][lineno]
         except KeyError:
             return (None, None)
 
@@ -73,4 +283,4 @@ if __name__ == '__main__':
     import pprint
     floc = FunctionLocator()
     floc.process_file(sys.argv[1])
-    pprint.pprint(floc.funct_ranges)
+    pprint.pprint(floc.funct_ranges[sys.argv[1]])
@@ -0,0 +1,307 @@
+"""
+Setup functions for the 'openmdao memreport' command plugin.
+
+This command reports the memory held by the vectors, jacobians and solvers of each System.
+"""
+
+import sys
+
+import numpy as np
+from scipy.sparse import issparse
+
+from openmdao.utils.hooks import _register_hook
+from openmdao.utils.file_utils import _load_and_exec
+from openmdao.utils.mpi import MPI
+from openmdao.core.component import Component
+from openmdao.matrices.matrix import Matrix
+from openmdao.jacobians.jacobian import Jacobian
+
+
+_vec_types = ('input', 'output', 'residual')
+_mem_keys = ('total', 'vectors', 'jacobian', 'solvers', 'dense_subjacs', 'sparse_subjacs')
+
+
+def _array_nbytes(obj):
+    """
+    Return the number of bytes held by the given array, sparse matrix or LU factorization.
+
+    Parameters
+    ----------
+    obj : object
+        Object that may hold array data.
+
+    Returns
+    -------
+    int
+        The number of bytes, or 0 if obj doesn't hold array data.
+    """
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if issparse(obj):
+        return sum(getattr(obj, a).nbytes for a in ('data', 'indices', 'indptr', 'row', 'col')
+                   if isinstance(getattr(obj, a, None), np.ndarray))
+    if type(obj).__name__ == 'SuperLU':
+        # L and U are built on access, so estimate from the number of nonzeros assuming float
+        # values and int32 indices
+        return obj.nnz * 12 + obj.perm_r.nbytes + obj.perm_c.nbytes
+    if isinstance(obj, (tuple, list)):  # e.g. scipy.linalg.lu_factor returns (lu, piv)
+        return sum(_array_nbytes(o) for o in obj if isinstance(o, np.ndarray))
+    return 0
+
+
+def _obj_nbytes(obj, seen):
+    """
+    Return the number of bytes held in array attributes of the given object.
+
+    Matrix and Jacobian attributes are searched as well, so the assembled matrices owned by
+    a solver are included.  Any object id found in seen is skipped so that objects shared
+    between Systems and Solvers are only counted once.
+
+    Parameters
+    ----------
+    obj : object
+        The object being searched.
+    seen : set
+        Ids of objects that have already been counted.
+
+    Returns
+    -------
+    int
+        The number of bytes.
+    """
+    if obj is None or id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    total = 0
+    for val in vars(obj).values():
+        if id(val) in seen:
+            continue
+        if isinstance(val, Jacobian):
+            # subjacs belong to the components, so only count the assembled matrices
+            seen.add(id(val._subjacs_info))
+            total += _obj_nbytes(val, seen)
+        elif isinstance(val, Matrix):
+            total += _obj_nbytes(val, seen)
+        else:
+            nbytes = _array_nbytes(val)
+            if nbytes:
+                seen.add(id(val))
+                total += nbytes
+    return total
+
+
+def get_system_mem(problem):
+    """
+    Return the memory held by each System in the model, both exclusive and rolled up.
+
+    Vector memory is computed from the local variable sizes of each Component, since the
+    vectors of a Group are views into the root vectors.  Jacobian memory for a Component comes
+    from its subjacs and for a Group from its assembled jacobian, if any.  Solver memory is the
+    size of the arrays held by the linear and nonlinear solvers (and line search) of the System.
+
+    Parameters
+    ----------
+    problem : <Problem>
+        The problem object that contains the model.  It must have completed final_setup.
+
+    Returns
+    -------
+    dict
+        Entries of the form pathname: dict of memory data, in model tree order.  The
+        'inclusive' entry of each contains the same data summed over the System and all of
+        its descendants.
+    """
+    model = problem.model
+
+    itemsizes = {}
+    for vec_type in _vec_types:
+        for vec_name, vec in model._vectors[vec_type].items():
+            itemsizes[vec_type, vec_name] = vec._data.itemsize
+
+    seen = set()
+    data = {}
+    for s in model.system_iter(include_self=True, recurse=True):
+        entry = data[s.pathname] = {
+            'msginfo': s.msginfo,
+            'is_group': not isinstance(s, Component),
+            'vectors': 0,
+            'jacobian': 0,
+            'solvers': 0,
+            'dense_subjacs': 0,
+            'sparse_subjacs': 0,
+        }
+
+        if isinstance(s, Component):
+            sizes = s._var_sizes
+            rank = s.comm.rank
+            local = {
+                'input': np.sum(sizes['input'][rank]),
+                'output': np.sum(sizes['output'][rank]),
+            }
+            local['residual'] = local['output']
+            entry['vectors'] = int(sum(local[vec_type] * itemsize
+                                       for (vec_type, _), itemsize in itemsizes.items()))
+
+            for meta in s._subjacs_info.values():
+                val = meta['val']
+                if meta.get('rows') is None and not (meta.get('diagonal') or issparse(val)):
+                    entry['dense_subjacs'] += 1
+                else:
+                    entry['sparse_subjacs'] += 1
+                entry['jacobian'] += sum(_array_nbytes(meta.get(n))
+                                         for n in ('val', 'rows', 'cols'))
+        else:
+            jac = s._assembled_jac
+            if jac is not None:
+                # subjacs belong to the components, so only count the assembled matrices
+                seen.add(id(jac._subjacs_info))
+                entry['jacobian'] = _obj_nbytes(jac, seen)
+
+        for solver in (s.linear_solver, s.nonlinear_solver,
+                       getattr(s.nonlinear_solver, 'linesearch', None)):
+            if solver is not None:
+                entry['solvers'] += _obj_nbytes(solver, seen)
+
+        entry['total'] = entry['vectors'] + entry['jacobian'] + entry['solvers']
+        entry['inclusive'] = dict.fromkeys(_mem_keys, 0)
+
+    # roll up through the model tree
+    for path, entry in data.items():
+        parts = path.split('.') if path else []
+        for i in range(len(parts) + 1):
+            incl = data['.'.join(parts[:i])]['inclusive']
+            for key in _mem_keys:
+                incl[key] += entry[key]
+
+    return data
+
+
+def dump_mem_report(problem, limit=20, stream=sys.stdout):
+    """
+    Print memory held by the vectors, jacobians and solvers of each Group and Component.
+
+    Parameters
+    ----------
+    problem : <Problem>
+        The problem object that contains the model.  It must have completed final_setup.
+    limit : int
+        Maximum number of Components to display.
+    stream : File-like
+        Where dump output will go.
+    """
+    if MPI and MPI.COMM_WORLD.rank != 0:
+        return
+
+    data = get_system_mem(problem)
+    model = problem.model
+
+    title = "Root Vector Memory"
+    print(title, file=stream)
+    print('-' * len(title), file=stream)
+    for vec_type in _vec_types:
+        for vec_name, vec in model._vectors[vec_type].items():
+            print("{:<10} {:<10} {:>12.1f} KiB".format(vec_type, vec_name,
+                                                       vec._data.nbytes / 1024), file=stream)
+
+    template = "{0:>14} {1:>14} {2:>14} {3:>14} {4:>7} {5:>7}  {6}"
+    header = template.format('Total (KiB)', 'Vectors (KiB)', 'Jac (KiB)', 'Solvers (KiB)',
+                             'Dense', 'Sparse', 'System')
+
+    def _row(mem, msginfo):
+        return template.format('%.1f' % (mem['total'] / 1024), '%.1f' % (mem['vectors'] / 1024),
+                               '%.1f' % (mem['jacobian'] / 1024), '%.1f' % (mem['solvers'] / 1024),
+                               mem['dense_subjacs'], mem['sparse_subjacs'], msginfo)
+
+    title = "Group Memory (including subsystems)"
+    print("\n\n%s" % title, file=stream)
+    print('-' * len(title), file=stream)
+    print(header, file=stream)
+    for entry in data.values():
+        if entry['is_group']:
+            print(_row(entry['inclusive'], entry['msginfo']), file=stream)
+
+    comps = sorted((e for e in data.values() if not e['is_group']), key=lambda e: e['total'],
+                   reverse=True)
+    title = "%d Components Using the Most Memory" % limit
+    print("\n\n%s" % title, file=stream)
+    print('-' * len(title), file=stream)
+    print(header, file=stream)
+    for entry in comps[:limit]:
+        print(_row(entry, entry['msginfo']), file=stream)
+    if len(comps) > limit:
+        print("%d other Components: %.1f KiB" % (len(comps) - limit,
+                                                 sum(e['total'] for e in comps[limit:]) / 1024),
+              file=stream)
+    print("\nTotal: %.1f KiB" % (data['']['inclusive']['total'] / 1024), file=stream)
+
+
+def _memreport_setup_parser(parser):
+    """
+    Set up the openmdao subparser for the 'openmdao memreport' command.
+
+    Parameters
+    ----------
+    parser : argparse subparser
+        The parser we're adding options to.
+    """
+    parser.add_argument('file', nargs=1, help='Python file containing the model.')
+    parser.add_argument('-o', default=None, action='store', dest='outfile',
+                        help='Name of output file.  By default, output goes to stdout.')
+    parser.add_argument('-l', '--limit', action='store', type=int, default=20, dest='limit',
+                        help='Limit the number of Components in the output.')
+    parser.add_argument('-r', '--run', action='store_true', dest='run',
+                        help="Report after the script finishes instead of after final_setup, so "
+                        "that arrays allocated by the solvers during runs and linearization, "
+                        "e.g. by compute_totals, are included.")
+
+
+def _memreport_exec(options, user_args):
+    """
+    Register the hook function for 'openmdao memreport' and run the script.
+
+    Parameters
+    ----------
+    options : argparse Namespace
+        Command line options.
+    user_args : list of str
+        Args to be passed to the user script.
+    """
+    if options.outfile is None:
+        out = sys.stdout
+    else:
+        out = open(options.outfile, 'w')
+
+    def _memreport(prob):
+        dump_mem_report(prob, limit=options.limit, stream=out)
+        exit()
+
+    if options.run:
+        # report on the first Problem that ran, once the script is done with it
+        ran = []
+
+        def _save_prob(prob):
+            if not ran:
+                ran.append(prob)
+
+        _register_hook('run_model', 'Problem', post=_save_prob)
+        _register_hook('run_driver', 'Problem', post=_save_prob)
+        try:
+            _load_and_exec(options.file[0], user_args)
+        finally:
+            if ran:
+                dump_mem_report(ran[0], limit=options.limit, stream=out)
+    else:
+        _register_hook('final_setup', 'Problem', post=_memreport)
+        _load_and_exec(options.file[0], user_args)
+
+
+def _memreport_setup():
+    """
+    A command to report the memory held by the vectors, jacobians and solvers of each System.
+    """
+    return (
+        _memreport_setup_parser,
+        _memreport_exec,
+        "Report memory held by the vectors, jacobians and solvers of each System."
+        )
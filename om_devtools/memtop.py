@@ -8,18 +8,52 @@ from __future__ import print_function
 
 import os
 import sys
+import io
+import time
+import json
+import weakref
+import threading
 import linecache
 import tracemalloc
+from collections import defaultdict
+
+import numpy as np
+
 from openmdao.utils.file_utils import _load_and_exec
+from openmdao.utils.mpi import MPI
+from openmdao.utils.hooks import _register_hook
+from openmdao.core.system import System
+from openmdao.solvers.solver import Solver
 
 
-# the following function is taken from the python tracemalloc docs.
+# Problem methods that mark the boundaries of memory phases
+_phase_methods = ('setup', 'final_setup', 'run_model', 'run_driver', 'compute_totals')
 
-def display_top(snapshot, key_type='lineno', limit=10, file=sys.stdout):
-    snapshot = snapshot.filter_traces((
+
+def _filter_snapshot(snapshot, filters=()):
+    """
+    Remove traces that don't correspond to user or library source lines.
+
+    Any additional tracemalloc.Filters are applied as well.
+    """
+    return snapshot.filter_traces((
         tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
         tracemalloc.Filter(False, "<unknown>"),
-    ))
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, linecache.__file__),
+        tracemalloc.Filter(False, __file__),
+    ) + tuple(filters))
+
+
+def _short_fname(filename):
+    # replace "/path/to/module/file.py" with "module/file.py"
+    return os.sep.join(filename.split(os.sep)[-2:])
+
+
+# the following function is taken from the python tracemalloc docs.
+
+def display_top(snapshot, key_type='lineno', limit=10, file=sys.stdout):
+    snapshot = _filter_snapshot(snapshot)
     top_stats = snapshot.statistics(key_type)
 
     pstr = "%s Source Lines Using the Most Memory" % limit
@@ -29,10 +63,8 @@ def display_top(snapshot, key_type='lineno', limit=10, file=sys.stdout):
     print('-' * len(pstr), file=file)
     for index, stat in enumerate(top_stats[:limit], 1):
         frame = stat.traceback[0]
-        # replace "/path/to/module/file.py" with "module/file.py"
-        filename = os.sep.join(frame.filename.split(os.sep)[-2:])
         print("#%s: %s:%s: %.1f KiB"
-              % (index, filename, frame.lineno, stat.size / 1024), file=file)
+              % (index, _short_fname(frame.filename), frame.lineno, stat.size / 1024), file=file)
         line = linecache.getline(frame.filename, frame.lineno).strip()
         if line:
             print('    %s' % line, file=file)
@@ -45,6 +77,645 @@ def display_top(snapshot, key_type='lineno', limit=10, file=sys.stdout):
     print("Total allocated size: %.1f KiB" % (total / 1024), file=file)
 
 
+def _line_sizes(snapshot):
+    """
+    Return a dict of allocated size keyed on (filename, lineno) for the given snapshot.
+    """
+    sizes = {}
+    for stat in _filter_snapshot(snapshot).statistics('lineno'):
+        frame = stat.traceback[0]
+        sizes[frame.filename, frame.lineno] = stat.size
+    return sizes
+
+
+def display_top_mpi(snapshot, comm, limit=10, imbalance=1.25, file=sys.stdout):
+    """
+    Gather per line memory from all ranks to rank 0 and display it.
+
+    Parameters
+    ----------
+    snapshot : tracemalloc.Snapshot
+        Snapshot from the current rank.
+    comm : MPI.Comm
+        The communicator containing all of the ranks.
+    limit : int
+        Maximum number of source lines to display.
+    imbalance : float
+        Ranks whose total or peak memory exceeds the mean across ranks by this factor are
+        flagged in the report.
+    file : file-like
+        Where the output will go.  Only used on rank 0.
+    """
+    rank_data = comm.gather((_line_sizes(snapshot), tracemalloc.get_traced_memory()[1]), root=0)
+    if comm.rank == 0:
+        _display_rank_data(rank_data, limit=limit, imbalance=imbalance, file=file)
+
+
+def _display_rank_data(rank_data, limit=10, imbalance=1.25, file=sys.stdout):
+    """
+    Display per line memory min/mean/max across ranks along with per rank totals.
+
+    Parameters
+    ----------
+    rank_data : list
+        Entries of the form (line_sizes, peak) for each rank, where line_sizes is a dict of
+        allocated size keyed on (filename, lineno).
+    limit : int
+        Maximum number of source lines to display.
+    imbalance : float
+        Ranks whose total or peak memory exceeds the mean across ranks by this factor are
+        flagged in the report.
+    file : file-like
+        Where the output will go.
+    """
+    nranks = len(rank_data)
+    keys = sorted(set().union(*[sizes for sizes, _ in rank_data]))
+    # lines that don't allocate on a given rank count as 0
+    table = np.zeros((len(keys), nranks))
+    for rank, (sizes, _) in enumerate(rank_data):
+        for i, key in enumerate(keys):
+            table[i, rank] = sizes.get(key, 0)
+
+    lmax = table.max(axis=1) if keys else table
+    order = np.argsort(lmax)[::-1]
+
+    pstr = "%s Source Lines Using the Most Memory on Any of %d Ranks" % (limit, nranks)
+    if file is sys.stdout:
+        print('\n\n')
+    print(pstr, file=file)
+    print('-' * len(pstr), file=file)
+    for index, i in enumerate(order[:limit], 1):
+        filename, lineno = keys[i]
+        row = table[i]
+        print("#%s: %s:%s: min %.1f KiB, mean %.1f KiB, max %.1f KiB (rank %d)"
+              % (index, _short_fname(filename), lineno, row.min() / 1024, row.mean() / 1024,
+                 row.max() / 1024, row.argmax()), file=file)
+        line = linecache.getline(filename, lineno).strip()
+        if line:
+            print('    %s' % line, file=file)
+
+    totals = table.sum(axis=0)
+    peaks = np.array([peak for _, peak in rank_data], dtype=float)
+    mean_total = totals.mean()
+    mean_peak = peaks.mean()
+
+    pstr = "Memory per Rank"
+    print('\n%s' % pstr, file=file)
+    print('-' * len(pstr), file=file)
+    template = "{0:>6}  {1:>16}  {2:>16}  {3}"
+    print(template.format('Rank', 'Total (KiB)', 'Peak (KiB)', '').rstrip(), file=file)
+    for rank in range(nranks):
+        flag = ''
+        if totals[rank] > imbalance * mean_total or peaks[rank] > imbalance * mean_peak:
+            flag = '<-- %.2fx mean total, %.2fx mean peak' % (
+                totals[rank] / mean_total if mean_total else 0.,
+                peaks[rank] / mean_peak if mean_peak else 0.)
+        print(template.format(rank, '%.1f' % (totals[rank] / 1024), '%.1f' % (peaks[rank] / 1024),
+                              flag).rstrip(), file=file)
+    print("Total allocated size (all ranks): %.1f KiB" % (totals.sum() / 1024), file=file)
+    if totals.min() > 0:
+        print("Max/min total per rank: %.2f" % (totals.max() / totals.min()), file=file)
+
+
+def display_diff(diff_stats, title, limit=10, file=sys.stdout):
+    """
+    Display the source lines with the largest change in allocated memory.
+
+    Parameters
+    ----------
+    diff_stats : list of tracemalloc.StatisticDiff
+        Differences between two snapshots, as returned by Snapshot.compare_to.
+    title : str
+        Title of the report.
+    limit : int
+        Maximum number of source lines to display.
+    file : file-like
+        Where the output will go.
+    """
+    print(title, file=file)
+    print('-' * len(title), file=file)
+    for index, stat in enumerate(diff_stats[:limit], 1):
+        frame = stat.traceback[0]
+        print("#%s: %s:%s: %+.1f KiB (%+d blocks)"
+              % (index, _short_fname(frame.filename), frame.lineno, stat.size_diff / 1024,
+                 stat.count_diff), file=file)
+        line = linecache.getline(frame.filename, frame.lineno).strip()
+        if line:
+            print('    %s' % line, file=file)
+
+    other = diff_stats[limit:]
+    if other:
+        size = sum(stat.size_diff for stat in other)
+        print("%s other: %+.1f KiB" % (len(other), size / 1024), file=file)
+    total = sum(stat.size_diff for stat in diff_stats)
+    print("Total change: %+.1f KiB" % (total / 1024), file=file)
+
+
+class _PhaseTracker(object):
+    """
+    Take tracemalloc snapshots at the boundaries of the Problem methods in _phase_methods.
+
+    Phases may be nested (run_model calls final_setup for example), so the diff reported for
+    a phase is taken relative to the end of the phase that completed before it.  Only the most
+    recent snapshot is kept, so memory held by the tracker doesn't grow with the number of phases.
+
+    Parameters
+    ----------
+    limit : int
+        Maximum number of source lines to display for each phase diff.
+
+    Attributes
+    ----------
+    limit : int
+        Maximum number of source lines to display for each phase diff.
+    phases : list
+        Entries of the form (label, current, peak, diff_report) for each completed phase.
+    _stack : list
+        Entries of the form [label, peak] for each active phase.
+    _counts : dict
+        Number of times each phase method has been called.
+    _prev : tracemalloc.Snapshot or None
+        Snapshot taken at the end of the most recently completed phase.
+    """
+
+    def __init__(self, limit=10):
+        self.limit = limit
+        self.phases = []
+        self._stack = []
+        self._counts = {}
+        self._prev = None
+
+    def _update_peaks(self):
+        current, peak = tracemalloc.get_traced_memory()
+        if hasattr(tracemalloc, 'reset_peak'):  # python >= 3.9
+            tracemalloc.reset_peak()
+        for entry in self._stack:
+            entry[1] = max(entry[1], peak)
+        return current
+
+    def _pre(self, meth):
+        current = self._update_peaks()
+        if self._prev is None:
+            self._prev = _filter_snapshot(tracemalloc.take_snapshot())
+        self._counts[meth] = count = self._counts.get(meth, 0) + 1
+        label = meth if count == 1 else '%s #%d' % (meth, count)
+        self._stack.append([label, current])
+
+    def _post(self, meth):
+        current = self._update_peaks()
+        label, peak = self._stack.pop()
+        snapshot = _filter_snapshot(tracemalloc.take_snapshot())
+        report = io.StringIO()
+        display_diff(snapshot.compare_to(self._prev, 'lineno'),
+                     "Top %d Changes at End of %s" % (self.limit, label),
+                     limit=self.limit, file=report)
+        self._prev = snapshot
+        self.phases.append((label, current, peak, report.getvalue()))
+
+    def register_hooks(self):
+        """
+        Register pre and post hooks on all of the Problem phase methods.
+        """
+        for meth in _phase_methods:
+            _register_hook(meth, 'Problem', pre=lambda prob, m=meth: self._pre(m),
+                           post=lambda prob, m=meth: self._post(m))
+
+    def display(self, file=sys.stdout):
+        """
+        Display current and peak memory for each phase along with the top diffs.
+
+        Parameters
+        ----------
+        file : file-like
+            Where the output will go.
+        """
+        if file is sys.stdout:
+            print('\n\n')
+        pstr = "Traced Memory by Phase"
+        print(pstr, file=file)
+        print('-' * len(pstr), file=file)
+        lwid = max([len(p[0]) for p in self.phases] + [len('Phase')])
+        template = "{0:<{lwid}}  {1:>14}  {2:>14}"
+        print(template.format('Phase', 'Current (KiB)', 'Peak (KiB)', lwid=lwid), file=file)
+        for label, current, peak, _ in self.phases:
+            print(template.format(label, '%.1f' % (current / 1024), '%.1f' % (peak / 1024),
+                                  lwid=lwid), file=file)
+
+        for _, _, _, report in self.phases:
+            print('\n', file=file)
+            print(report, end='', file=file)
+
+
+class _LeakTracker(object):
+    """
+    Find source lines whose allocated memory grows monotonically over a series of snapshots.
+
+    Only the first and latest size of each source line that is still growing are kept between
+    snapshots, and lines are dropped for good as soon as their allocated size decreases.
+
+    Attributes
+    ----------
+    nsnaps : int
+        Number of snapshots processed so far.
+    _lines : dict
+        Entries of the form (filename, lineno): [first_size, last_size, nincreases] for each
+        source line whose allocated size has not decreased.
+    _dropped : set
+        (filename, lineno) of each source line whose allocated size decreased at some point.
+    """
+
+    def __init__(self):
+        self.nsnaps = 0
+        self._lines = {}
+        self._dropped = set()
+
+    def update(self, snapshot):
+        """
+        Update the per line statistics using the given snapshot.
+
+        Parameters
+        ----------
+        snapshot : tracemalloc.Snapshot
+            The latest snapshot.
+        """
+        old = self._lines
+        dropped = self._dropped
+        self._lines = lines = {}
+        for stat in _filter_snapshot(snapshot).statistics('lineno'):
+            frame = stat.traceback[0]
+            key = (frame.filename, frame.lineno)
+            if key in old:
+                first, last, nincr = old[key]
+                if stat.size < last:
+                    dropped.add(key)  # not monotonic, so ignore it from now on
+                    continue
+                lines[key] = [first, stat.size, nincr + (stat.size > last)]
+            elif key in dropped:
+                continue
+            elif self.nsnaps == 0:
+                lines[key] = [stat.size, stat.size, 0]
+            else:  # line had no allocations in any earlier snapshot
+                lines[key] = [0, stat.size, int(stat.size > 0)]
+
+        # lines whose allocations were all freed have shrunk too
+        dropped.update(key for key in old if key not in lines)
+
+        self.nsnaps += 1
+
+    def growing(self, steady=True):
+        """
+        Return source lines that have grown.
+
+        Lines that grew in every iteration after the first are steady growth, which is what a
+        leak looks like.  Lines that grew less often are usually one-time allocations like
+        caches that are filled during the first iterations.
+
+        Lines that grew in the most iterations come first, followed by growth per iteration.
+
+        Parameters
+        ----------
+        steady : bool
+            If True, return lines with steady growth, else return the lines that grew only in
+            some iterations.
+
+        Returns
+        -------
+        list
+            Entries of the form (filename, lineno, growth_rate, total_growth, nincreases).
+        """
+        if self.nsnaps < 2:
+            return []
+        niters = self.nsnaps - 1
+        min_incr = max(1, niters - 1)
+        grown = [(fname, lineno, (last - first) / niters, last - first, nincr)
+                 for (fname, lineno), (first, last, nincr) in self._lines.items()
+                 if last > first and (nincr >= min_incr) == steady]
+        return sorted(grown, key=lambda x: (x[4], x[2]), reverse=True)
+
+    def _display_lines(self, title, grown, limit, file):
+        print(title, file=file)
+        print('-' * len(title), file=file)
+        for index, (fname, lineno, rate, total, nincr) in enumerate(grown[:limit], 1):
+            print("#%s: %s:%s: %+.1f KiB/iter (%+.1f KiB total, grew in %d of %d iters)"
+                  % (index, _short_fname(fname), lineno, rate / 1024, total / 1024, nincr,
+                     self.nsnaps - 1), file=file)
+            line = linecache.getline(fname, lineno).strip()
+            if line:
+                print('    %s' % line, file=file)
+
+        other = grown[limit:]
+        if other:
+            rate = sum(g[2] for g in other)
+            print("%s other: %+.1f KiB/iter" % (len(other), rate / 1024), file=file)
+        rate = sum(g[2] for g in grown)
+        print("Total growth: %+.1f KiB/iter" % (rate / 1024), file=file)
+
+    def display(self, limit=10, file=sys.stdout):
+        """
+        Display the source lines with the highest growth rate.
+
+        Lines with steady growth are listed separately from lines that only grew in some
+        iterations.
+
+        Parameters
+        ----------
+        limit : int
+            Maximum number of source lines to display in each section.
+        file : file-like
+            Where the output will go.
+        """
+        if file is sys.stdout:
+            print('\n\n')
+        self._display_lines("%s Source Lines With Steadily Growing Memory (%d iterations)" %
+                            (limit, self.nsnaps - 1), self.growing(), limit, file)
+
+        occasional = self.growing(steady=False)
+        if occasional:
+            print('\n', file=file)
+            self._display_lines("%s Source Lines That Grew Only in Some Iterations (likely "
+                                "one-time allocations)" % limit, occasional, limit, file)
+
+
+def _register_leak_check(niters, meth, limit, file):
+    """
+    Register a hook that reruns the given Problem method to look for memory leaks.
+
+    The first call of the method made by the script serves as a warm-up.  After it completes,
+    the method is called niters more times with a snapshot taken after each call.
+
+    Parameters
+    ----------
+    niters : int
+        Number of times to run the method after the warm-up.
+    meth : str
+        Name of the Problem method, e.g., 'run_model' or 'run_driver'.
+    limit : int
+        Maximum number of source lines to display.
+    file : file-like
+        Where the output will go.
+    """
+    tracker = _LeakTracker()
+
+    def _leak_check(prob):
+        if tracker.nsnaps > 0:  # our own calls to meth below also trigger this hook
+            return
+        tracker.update(tracemalloc.take_snapshot())
+        for i in range(niters):
+            getattr(prob, meth)()
+            tracker.update(tracemalloc.take_snapshot())
+        tracker.display(limit=limit, file=file)
+        exit()
+
+    _register_hook(meth, 'Problem', post=_leak_check)
+
+
+class _SystemMemTracker(object):
+    """
+    Attribute the net traced memory allocated while running to the innermost System on the stack.
+
+    A profile function tracks calls to methods of System and Solver instances.  Each time the
+    innermost instance changes, the change in traced memory since the previous change is charged
+    to the System that was innermost (a Solver charges its owning System).  Tracebacks recorded by
+    tracemalloc don't include the instance that owns each frame, so this gives the same per
+    instance attribution that statprof uses without having to walk a traceback per allocation.
+
+    Attributes
+    ----------
+    unattributed : int
+        Net bytes allocated while no System or Solver method was active.
+    _stack : list
+        Entries of the form (frame, instance, system) for each active System or Solver method.
+    _mem : dict
+        Net bytes allocated, keyed on id(system).
+    _systems : dict
+        System instances, keyed on id(system).
+    _last : int
+        Traced memory at the time of the last charge.
+    """
+
+    def __init__(self):
+        self.unattributed = 0
+        self._stack = []
+        self._mem = defaultdict(int)
+        self._systems = {}
+        self._last = 0
+
+    def _charge(self):
+        current = tracemalloc.get_traced_memory()[0]
+        if self._stack:
+            self._mem[id(self._stack[-1][2])] += current - self._last
+        else:
+            self.unattributed += current - self._last
+        self._last = current
+
+    def _profile(self, frame, event, arg):
+        stack = self._stack
+        if event == 'call':
+            code = frame.f_code
+            if code.co_argcount > 0 and code.co_varnames[0] == 'self':
+                slf = frame.f_locals.get('self')
+                if isinstance(slf, (System, Solver)) and not (stack and stack[-1][1] is slf):
+                    if isinstance(slf, System):
+                        system = slf
+                    else:
+                        system = getattr(slf, '_system', None)
+                        if isinstance(system, weakref.ref):
+                            system = system()
+                        if system is None:
+                            return
+                    self._charge()
+                    self._systems[id(system)] = system
+                    stack.append((frame, slf, system))
+        elif event == 'return':
+            if stack and stack[-1][0] is frame:
+                self._charge()
+                stack.pop()
+
+    def start(self):
+        """
+        Start tracking.  tracemalloc must already be started.
+        """
+        self._last = tracemalloc.get_traced_memory()[0]
+        sys.setprofile(self._profile)
+
+    def stop(self):
+        """
+        Stop tracking.
+        """
+        sys.setprofile(None)
+        self._charge()
+        self._stack = []
+
+    def get_system_mem(self):
+        """
+        Return net allocated memory for each System, both exclusive and rolled up.
+
+        Returns
+        -------
+        dict
+            Entries of the form pathname: [inclusive, exclusive, msginfo].
+        """
+        mem = {}
+        for sid, nbytes in self._mem.items():
+            system = self._systems[sid]
+            try:
+                label = system.msginfo
+            except Exception:
+                label = type(system).__name__
+            if system.pathname in mem:
+                mem[system.pathname][1] += nbytes
+            else:
+                mem[system.pathname] = [0, nbytes, label]
+
+        # roll up through the model tree
+        for path, (_, excl, _) in list(mem.items()):
+            parts = path.split('.') if path else []
+            for i in range(len(parts) + 1):
+                ancestor = '.'.join(parts[:i])
+                if ancestor not in mem:
+                    mem[ancestor] = [0, 0, ancestor if ancestor else '<model>']
+                mem[ancestor][0] += excl
+
+        return mem
+
+    def display(self, limit=10, file=sys.stdout):
+        """
+        Display the Systems with the largest net allocated memory, including their descendants.
+
+        Parameters
+        ----------
+        limit : int
+            Maximum number of Systems to display.
+        file : file-like
+            Where the output will go.
+        """
+        mem = sorted(self.get_system_mem().values(), key=lambda x: x[0], reverse=True)
+
+        pstr = "%s Systems Allocating the Most Memory" % limit
+        if file is sys.stdout:
+            print('\n\n')
+        print(pstr, file=file)
+        print('-' * len(pstr), file=file)
+        template = "{0:>16}  {1:>16}  {2}"
+        print(template.format('Inclusive (KiB)', 'Exclusive (KiB)', 'System'), file=file)
+        for incl, excl, label in mem[:limit]:
+            print(template.format('%.1f' % (incl / 1024), '%.1f' % (excl / 1024), label),
+                  file=file)
+
+        if len(mem) > limit:
+            print("%s other Systems" % (len(mem) - limit), file=file)
+        print("Not attributed to any System: %.1f KiB" % (self.unattributed / 1024), file=file)
+
+
+class _StreamingSampler(object):
+    """
+    Periodically write the top allocating source lines to a file from a background thread.
+
+    After each sample, traces are cleared, so each window reports the memory allocated during
+    that window that is still alive at the end of it, and tracemalloc never holds more than one
+    window's worth of traces.  Each window is written as a single line of JSON.
+
+    Parameters
+    ----------
+    stream : file-like
+        Where the JSON lines will go.
+    interval : float
+        Length of each window in seconds.
+    limit : int
+        Number of top allocating source lines (or tracebacks) to write per window.
+    filters : list of tracemalloc.Filter
+        Filters applied to each snapshot before computing statistics.
+
+    Attributes
+    ----------
+    stream : file-like
+        Where the JSON lines will go.
+    interval : float
+        Length of each window in seconds.
+    limit : int
+        Number of top allocating source lines (or tracebacks) to write per window.
+    filters : list of tracemalloc.Filter
+        Filters applied to each snapshot before computing statistics.
+    nwindows : int
+        Number of windows written so far.
+    max_peak : int
+        Largest peak traced memory seen in any window.
+    _key_type : str
+        Statistics key type, 'traceback' if more than one frame is being stored, else 'lineno'.
+    _stop : threading.Event
+        Set to stop the sampling thread.
+    _thread : threading.Thread or None
+        The sampling thread.
+    _t0 : float
+        Start time of sampling.
+    """
+
+    def __init__(self, stream, interval=1.0, limit=10, filters=()):
+        self.stream = stream
+        self.interval = interval
+        self.limit = limit
+        self.filters = filters
+        self.nwindows = 0
+        self.max_peak = 0
+        self._key_type = 'lineno'
+        self._stop = threading.Event()
+        self._thread = None
+        self._t0 = 0.
+
+    def _sample(self):
+        t = time.perf_counter() - self._t0
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.clear_traces()
+
+        stats = _filter_snapshot(snapshot, self.filters).statistics(self._key_type)
+        del snapshot
+
+        top = []
+        for stat in stats[:self.limit]:
+            top.append([stat.size, stat.count,
+                        [[frame.filename, frame.lineno] for frame in stat.traceback]])
+
+        self.stream.write(json.dumps({
+            'window': self.nwindows,
+            'time': t,
+            'current': current,
+            'peak': peak,
+            'total': sum(stat.size for stat in stats),
+            'top': top,
+        }, separators=(',', ':')))
+        self.stream.write('\n')
+        self.stream.flush()
+
+        self.nwindows += 1
+        self.max_peak = max(self.max_peak, peak)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        """
+        Start the sampling thread.  tracemalloc must already be started.
+        """
+        if tracemalloc.get_traceback_limit() > 1:
+            self._key_type = 'traceback'
+        self._t0 = time.perf_counter()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the sampling thread and write the final window.
+        """
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._sample()
+
+
 def _memtop_setup_parser(parser):
     """
     Set up the openmdao subparser for the 'openmdao memtop' command.
@@ -59,6 +730,37 @@ def _memtop_setup_parser(parser):
                         help='Name of output file.  By default, output goes to stdout.')
     parser.add_argument('-l', '--limit', action='store', type=int, default=20, dest='limit',
                         help='Limit the number of lines in the output.')
+    parser.add_argument('-p', '--phases', action='store_true', dest='phases',
+                        help='Take snapshots at the end of setup, final_setup, run_model, '
+                        'run_driver and compute_totals and show the memory change during each.')
+    parser.add_argument('--leak', action='store', type=int, default=0, dest='leak',
+                        help='After the first call to run_model, call it this many more times '
+                        'and report source lines whose memory grows on each call.')
+    parser.add_argument('--leak_driver', action='store_true', dest='leak_driver',
+                        help='When used with --leak, call run_driver instead of run_model.')
+    parser.add_argument('-s', '--by_system', action='store_true', dest='by_system',
+                        help='Attribute allocated memory to the innermost System on the call '
+                        'stack and roll it up through the model tree.')
+    parser.add_argument('--imbalance', action='store', type=float, default=1.25,
+                        dest='imbalance',
+                        help='When running under MPI, flag ranks whose total or peak memory '
+                        'exceeds the mean across ranks by this factor.')
+    parser.add_argument('--stream', action='store', type=float, default=0., dest='stream',
+                        help='Write the top allocating lines to the stream file every STREAM '
+                        'seconds, clearing traces after each window, instead of taking a single '
+                        'snapshot at the end.')
+    parser.add_argument('--stream_file', action='store', default='memtop_stream.jsonl',
+                        dest='stream_file',
+                        help='Name of the file written by --stream. Defaults to '
+                        'memtop_stream.jsonl.')
+    parser.add_argument('--include', action='append', default=[], dest='includes',
+                        help='With --stream, only include allocations from files matching this '
+                        'glob pattern. This argument may be supplied multiple times.')
+    parser.add_argument('--exclude', action='append', default=[], dest='excludes',
+                        help='With --stream, exclude allocations from files matching this glob '
+                        'pattern. This argument may be supplied multiple times.')
+    parser.add_argument('--nframes', action='store', type=int, default=1, dest='nframes',
+                        help='Number of frames stored in each traceback. Defaults to 1.')
 
 
 def _memtop_exec(options, user_args):
@@ -72,17 +774,66 @@ def _memtop_exec(options, user_args):
     user_args : list of str
         Args to be passed to the user script.
     """
-    if options.outfile is None:
+    # under MPI, the default report is gathered to rank 0.  Other reports are per rank.
+    aggregate = MPI is not None and MPI.COMM_WORLD.size > 1 and \
+        not (options.phases or options.leak > 0 or options.by_system or options.stream > 0.)
+    rank = MPI.COMM_WORLD.rank if MPI else 0
+
+    if options.outfile is None or (aggregate and rank > 0):
         out = sys.stdout
-    else:
+    elif rank == 0:
         out = open(options.outfile, 'w')
+    else:
+        out = open('%s.%d' % (options.outfile, rank), 'w')
+
+    if options.phases:
+        tracker = _PhaseTracker(limit=options.limit)
+        tracker.register_hooks()
 
-    tracemalloc.start()
+    if options.leak > 0:
+        _register_leak_check(options.leak, 'run_driver' if options.leak_driver else 'run_model',
+                             options.limit, out)
+
+    tracemalloc.start(options.nframes)
+
+    if options.stream > 0.:
+        filters = [tracemalloc.Filter(True, pat) for pat in options.includes] + \
+            [tracemalloc.Filter(False, pat) for pat in options.excludes]
+        stream_file = options.stream_file
+        if MPI and MPI.COMM_WORLD.size > 1:
+            stream_file = '%s.%d' % (stream_file, rank)
+        with open(stream_file, 'w') as stream:
+            sampler = _StreamingSampler(stream, interval=options.stream, limit=options.limit,
+                                        filters=filters)
+            sampler.start()
+            try:
+                _load_and_exec(options.file[0], user_args)
+            finally:
+                sampler.stop()
+        print("Wrote %d windows to %s. Max peak traced memory: %.1f KiB" %
+              (sampler.nwindows, stream_file, sampler.max_peak / 1024), file=out)
+        return
+
+    if options.by_system:
+        systracker = _SystemMemTracker()
+        systracker.start()
+        try:
+            _load_and_exec(options.file[0], user_args)
+        finally:
+            systracker.stop()
+        systracker.display(limit=options.limit, file=out)
+        return
 
     _load_and_exec(options.file[0], user_args)
 
-    snapshot = tracemalloc.take_snapshot()
-    display_top(snapshot, limit=options.limit, file=out)
+    if options.phases:
+        tracker.display(file=out)
+    elif aggregate:
+        display_top_mpi(tracemalloc.take_snapshot(), MPI.COMM_WORLD, limit=options.limit,
+                        imbalance=options.imbalance, file=out)
+    else:
+        snapshot = tracemalloc.take_snapshot()
+        display_top(snapshot, limit=options.limit, file=out)
 
 
 def _memtop_setup():
@@ -3,40 +3,23 @@ import os
 import sys
 import subprocess
 import platform
+import hashlib
+import tempfile
+import threading
+from time import perf_counter
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from openmdao.utils.file_utils import files_iter
 
+from om_devtools.cache_utils import cache_file_name, load_cache, save_cache
+
 
 def nb2dict(fname):
     with open(fname) as f:
         return json.load(f)
 
 
-def notebook_filter(fname, filters):
-    """
-    Return True if the given notebook satisfies the given filter function.
-
-    Parameters
-    ----------
-    fname : str
-        Name of the notebook file.
-    filters : list of functions
-        The filter functions.  They take a dictionary as an arg and return True/False.
-
-    Returns
-    -------
-    bool
-        True if the filter returns True.
-    """
-    dct = nb2dict(fname)
-
-    for f in filters:
-        if f(dct):
-            return True
-
-    return False
-
-
 def is_parallel(dct):
     """
     Return True if the notebook containing the dict uses ipyparallel.
@@ -49,39 +32,149 @@ def is_parallel(dct):
     return False
 
 
-def section_filter(dct, section):
+def default_index_file():
     """
-    Return True if the notebook containing the dict contains the given section string.
+    Return the name of the notebook index file shared by notebook commands.
+
+    It can be set using the OM_DEVTOOLS_NB_INDEX environment variable.
     """
-    for cell in dct['cells']:
-        if cell['cell_type'] == 'markdown':
-            for line in cell['source']:
-                if section in line and line.startswith('#'):
-                    return True
-    return False
+    return cache_file_name('OM_DEVTOOLS_NB_INDEX', 'notebook_index.cache')
+
 
+def _nb_file_key(fname):
+    st = os.stat(fname)
+    return (st.st_size, st.st_mtime_ns)
 
-def string_filter(dct, s):
+
+class _NotebookStore(object):
     """
-    Return True if the notebook containing the dict contains the given string.
+    A dict of per notebook entries keyed on absolute filename that can be saved to a file.
+
+    Attributes
+    ----------
+    entries : dict
+        Entries of the form abs_fname: dict.
+    _fname : str or None
+        Name of the file where the entries are persisted.
+    _dirty : bool
+        True if there are entries that haven't been saved.
+    """
+
+    def __init__(self, fname=None):
+        self._fname = fname
+        self.entries = (load_cache(fname) or {}) if fname else {}
+        self._dirty = False
+
+    def save(self):
+        """
+        Save new entries to the file, merged with any saved by other sessions.
+
+        Entries for notebooks that no longer exist are dropped.
+        """
+        if not self._fname or not self._dirty:
+            return
+
+        entries = load_cache(self._fname) or {}
+        entries.update(self.entries)
+        entries = {f: e for f, e in entries.items() if os.path.isfile(f)}
+        if save_cache(self._fname, entries):
+            self._dirty = False
+
+
+class NotebookIndex(_NotebookStore):
+    """
+    An index of the searchable contents of notebooks, updated as notebooks change.
+
+    Each notebook is read and parsed only when it's new or its size or modification time has
+    changed since it was indexed.  If an index file is given, the index is saved there so it
+    can be reused by later sessions.
+
+    Entries contain the file key, the section headers, the text of markdown and code cells,
+    the full source and the parallel flag of each notebook.
     """
-    for cell in dct['cells']:
-        if cell['cell_type'] in ('markdown', 'code'):
-            for line in cell['source']:
-                if s in line:
-                    return True
-    return False
 
+    def get(self, fname):
+        """
+        Return the index entry for the given notebook, reindexing it first if it has changed.
+
+        Parameters
+        ----------
+        fname : str
+            Name of the notebook file.
+
+        Returns
+        -------
+        dict
+            Index entry with keys 'headers', 'text', 'src' and 'parallel'.
+        """
+        path = os.path.abspath(fname)
+        key = _nb_file_key(path)
+        entry = self.entries.get(path)
+        if entry is None or entry['key'] != key:
+            dct = nb2dict(path)
+            cells = [cell for cell in dct['cells'] if cell['cell_type'] in ('markdown', 'code')]
+            entry = {
+                'key': key,
+                'headers': [line for cell in cells if cell['cell_type'] == 'markdown'
+                            for line in cell['source'] if line.startswith('#')],
+                # cells are separated by newlines so matches can't span them
+                'text': '\n'.join(''.join(cell['source']) for cell in cells),
+                'src': _full_notebook_src(dct),
+                'parallel': is_parallel(dct),
+            }
+            self.entries[path] = entry
+            self._dirty = True
+        return entry
+
+    def matches(self, fname, section=None, string=None):
+        """
+        Return True if the given notebook has the given section or contains the given string.
+
+        Parameters
+        ----------
+        fname : str
+            Name of the notebook file.
+        section : str or None
+            Look for a section header containing this string.
+        string : str or None
+            Look for this string in a code or markdown cell.
+
+        Returns
+        -------
+        bool
+            True if either the section or the string is found, or neither is given.
+        """
+        if not section and not string:
+            return True
+        entry = self.get(fname)
+        if section and any(section in h for h in entry['headers']):
+            return True
+        return bool(string) and string in entry['text']
+
+
+def find_notebooks_iter(section=None, string=None, index=None):
+    """
+    Yield names of notebooks at or below the current directory matching the section or string.
 
-def find_notebooks_iter(section=None, string=None):
-    filters = []
-    if section:
-        filters.append(lambda dct: section_filter(dct, section))
-    if string:
-        filters.append(lambda dct: string_filter(dct, string))
+    Parameters
+    ----------
+    section : str or None
+        Look for notebooks having a section header containing this string.
+    string : str or None
+        Look for notebooks having this string in a code or markdown cell.
+    index : NotebookIndex or None
+        Index used to look up notebook contents.  If None, a temporary one is used.
+
+    Yields
+    ------
+    str
+        Name of a matching notebook.
+    """
+    if index is None:
+        index = NotebookIndex()
 
     for f in files_iter(file_includes=['*.ipynb'], dir_excludes=['.ipynb_checkpoints', '_*']):
-        if not filters or notebook_filter(f, filters):
+        if index.matches(f, section, string):
             yield f
 
 
@@ -121,34 +214,52 @@ def _show_notebook_exec(options, user_args):
     else:
         fname = options.file + '.ipynb'
 
+    index = NotebookIndex(default_index_file())
+
     if fname is not None:
-        files = [f for f in find_notebooks_iter() if os.path.basename(f) == fname]
+        files = [f for f in find_notebooks_iter(index=index) if os.path.basename(f) == fname]
         if not files:
             print(f"Can't find file {fname}.")
             sys.exit(-1)
     else:
-        files = list(find_notebooks_iter(section=options.section, string=options.string))
+        files = list(find_notebooks_iter(section=options.section, string=options.string,
+                                         index=index))
         if not files:
+            index.save()
             print(f"No matching notebook files found.")
             sys.exit(-1)
 
-    if len(files) == 1:
-        show_notebook(files[0], nb2dict(files[0]))
-    else:
-        f = pick_one(files)
-        show_notebook(f, nb2dict(f))
+    f = files[0] if len(files) == 1 else pick_one(files)
+    parallel = index.get(f)['parallel']
+    index.save()
+    show_notebook(f, parallel=parallel)
+
 
+def show_notebook(f, dct=None, parallel=None):
+    """
+    Display the given notebook using jupyter.
+
+    Parameters
+    ----------
+    f : str
+        Name of the notebook file.
+    dct : dict or None
+        Contents of the notebook.  Only used if parallel is None.
+    parallel : bool or None
+        True if the notebook uses ipyparallel.  If None, it's determined from the contents.
+    """
+    if parallel is None:
+        parallel = is_parallel(nb2dict(f) if dct is None else dct)
 
-def show_notebook(f, dct):
-    if is_parallel(dct):
+    if parallel:
         pidfile = os.path.join(os.path.expanduser('~'), '.ipython/profile_mpi/pid/ipcluster.pid')
         if not os.path.isfile(pidfile):
             print("cluster isn't running...")
             sys.exit(-1)
         else:
             # try to see if PID is running
-            with open(pidfile, 'r') as f:
-                pid = int(f.read().strip())
+            with open(pidfile, 'r') as pf:
+                pid = int(pf.read().strip())
             try:
                 import psutil
             except ImportError:
@@ -224,9 +335,18 @@ def get_full_notebook_src(fname):
     str
         Source of the given notebook.
     """
+    return _full_notebook_src(nb2dict(fname))
+
+
+def _full_notebook_src(dct):
+    """
+    Return the full contents of source cells in the given notebook dict.
+    """
     lines = []
-    for srclines, _, _ in notebook_src_cell_iter(fname):
-        for s in srclines:
+    for cell in dct['cells']:
+        if cell['cell_type'] != 'code':
+            continue
+        for s in cell['source']:
             ls = s.lstrip()
             if ls.startswith('!') or ls.startswith('%'):
                 lines.append(' ' * (len(s) - len(ls)) + 'pass # ' + ls.rstrip())
@@ -236,7 +356,7 @@ def get_full_notebook_src(fname):
 
 
 def grep_notebooks(includes=('*.ipynb',), dir_excludes=('_build', '_srcdocs', '.ipynb_checkpoints'),
-                   greps=()):
+                   greps=(), index=None):
     """
     Yield the file pathname and the full contents of source cells from matching notebooks.
 
@@ -249,6 +369,8 @@ def grep_notebooks(includes=('*.ipynb',), dir_excludes=('_build', '_srcdocs', '.
     greps : list of str
         If not empty, only return names and source from notebooks whose source contains at least
         one of the strings provided.
+    index : NotebookIndex or None
+        Index used to look up notebook source.  If None, a temporary one is used.
 
     Yields
     ------
@@ -257,8 +379,11 @@ def grep_notebooks(includes=('*.ipynb',), dir_excludes=('_build', '_srcdocs', '.
     str
         Full contents of source cells from the given notebook.
     """
+    if index is None:
+        index = NotebookIndex()
+
     for fpath in files_iter(file_includes=includes, dir_excludes=dir_excludes):
-        full = get_full_notebook_src(fpath)
+        full = index.get(fpath)['src']
         if not greps:
             yield fpath, full
         else:
@@ -268,8 +393,190 @@ def grep_notebooks(includes=('*.ipynb',), dir_excludes=('_build', '_srcdocs', '.
                     break
 
 
+def default_run_cache_file():
+    """
+    Return the name of the file where notebook run results are cached.
+
+    It can be set using the OM_DEVTOOLS_NB_RUN_CACHE environment variable.
+    """
+    return cache_file_name('OM_DEVTOOLS_NB_RUN_CACHE', 'notebook_runs.cache')
+
+
+def _get_env_hash():
+    """
+    Return a hash of the python version and the names and versions of installed packages.
+    """
+    from importlib.metadata import distributions
+
+    pkgs = sorted('%s==%s' % (d.metadata['Name'], d.version) for d in distributions())
+    return hashlib.sha256('\n'.join([sys.version] + pkgs).encode()).hexdigest()
+
+
+class NotebookRunCache(_NotebookStore):
+    """
+    Results of the most recent run of each notebook.
+
+    Each result is stored with a hash of the source that was run, the number of processes
+    used and the installed package versions, so a result only applies if none of those have
+    changed.
+
+    Entries contain the run hash, return code, output, errors and runtime of each notebook.
+
+    Attributes
+    ----------
+    _env_hash : str or None
+        Hash of the installed package versions, computed when first needed.
+    """
+
+    def __init__(self, fname=None):
+        super().__init__(fname)
+        self._env_hash = None
+
+    def run_hash(self, src, nprocs):
+        """
+        Return the hash identifying a run of the given source.
+
+        Parameters
+        ----------
+        src : str
+            Full python source contained in the notebook.
+        nprocs : int
+            Number of processes used for the run.
+
+        Returns
+        -------
+        str
+            The hash.
+        """
+        if self._env_hash is None:
+            self._env_hash = _get_env_hash()
+        return hashlib.sha256('\n'.join([self._env_hash, str(nprocs), src]).encode()).hexdigest()
+
+    def get_passed(self, fname, src, nprocs):
+        """
+        Return the cached result if the given notebook source already ran successfully.
+
+        Parameters
+        ----------
+        fname : str
+            Name of the notebook file.
+        src : str
+            Full python source contained in the notebook.
+        nprocs : int
+            Number of processes used for the run.
+
+        Returns
+        -------
+        dict or None
+            The cached result, or None if the notebook needs to be run.
+        """
+        entry = self.entries.get(os.path.abspath(fname))
+        if entry is not None and entry['returncode'] == 0 and \
+                entry['hash'] == self.run_hash(src, nprocs):
+            return entry
+        return None
+
+    def add(self, fname, src, nprocs, returncode, out, errs, runtime):
+        """
+        Store the result of running the given notebook.
+
+        Parameters
+        ----------
+        fname : str
+            Name of the notebook file.
+        src : str
+            Full python source contained in the notebook.
+        nprocs : int
+            Number of processes used for the run.
+        returncode : int
+            Return code of the run.
+        out : str
+            Output of the run.
+        errs : str
+            Errors and warnings from the run.
+        runtime : float
+            Elapsed time of the run in seconds.
+        """
+        self.entries[os.path.abspath(fname)] = {
+            'hash': self.run_hash(src, nprocs),
+            'returncode': returncode,
+            'stdout': out,
+            'stderr': errs,
+            'runtime': runtime,
+        }
+        self._dirty = True
+
+
+def _get_nprocs(src, nprocs):
+    """
+    Return the number of processes needed to run the given notebook source.
+    """
+    # only run on nprocs if we find %px in the source
+    return nprocs if '%px' in src else 1
+
+
+def _run_src(src, nprocs=1, timeout=None):
+    """
+    Run python source from a notebook in its own temporary source file and working directory.
+
+    Parameters
+    ----------
+    src : str
+        Full python source contained in the notebook.
+    nprocs : int
+        Number of processes to use.  If greater than 1, the source is run under mpirun.
+    timeout : float
+        If set, terminate the running code after 'timeout' seconds.
+
+    Returns
+    -------
+    int
+        Return code.
+    str
+        Output of the run.
+    str
+        Errors and warnings from the run.
+    float
+        Elapsed time of the run in seconds.
+    """
+    start = perf_counter()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        srcfile = os.path.join(tmpdir, '_notebook_src_.py')
+        with open(srcfile, 'w') as tmp:
+            tmp.write(src)
+        if nprocs == 1:
+            cmd = ['python', srcfile]
+        else:
+            cmd = ['mpirun', '-n', str(nprocs), 'python', srcfile]
+        try:
+            proc = subprocess.run(cmd, text=True, capture_output=True, timeout=timeout,
+                                  cwd=tmpdir)
+        except subprocess.TimeoutExpired as err:
+            out, errs = [s.decode() if isinstance(s, bytes) else (s or '')
+                         for s in (err.stdout, err.stderr)]
+            return (-1, out, errs + f"\nTerminated after timeout of {timeout} seconds.",
+                    perf_counter() - start)
+
+    return proc.returncode, proc.stdout, proc.stderr, perf_counter() - start
+
+
+def _print_header(fname, src, show_src, outstream):
+    print('&' * 20, ' running', fname, ' ' + '&' * 20, file=outstream, flush=True)
+    if show_src:
+        print(src, file=outstream)
+    print('-=' * 40, file=outstream)
+
+
+def _print_result(fname, returncode, out, errs, outstream, errstream):
+    if returncode != 0:
+        print(f"{fname} return code = {returncode}.", file=errstream)
+    print(out, file=outstream)
+    print(errs, file=errstream)
+    print('-=' * 40, file=outstream)
+
+
 def run_notebook_src(fname, src, nprocs=1, show_src=True, timeout=None, outstream=sys.stdout,
-                     errstream=sys.stderr):
+                     errstream=sys.stderr, cache=None):
     """
     Execute python source code from notebook(s).
 
@@ -289,33 +596,114 @@ def run_notebook_src(fname, src, nprocs=1, show_src=True, timeout=None, outstrea
         File where output is written.
     errstream : file
         File where errors and warnings are written.
+    cache : NotebookRunCache or None
+        If given, the result of the run is stored here.
+
+    Returns
+    -------
+    int
+        Return code of the run.
     """
-    # only run on nprocs if we find %px in the source
-    if '%px' not in src:
-        nprocs = 1
+    _print_header(fname, src, show_src, outstream)
+    nprocs = _get_nprocs(src, nprocs)
+    returncode, out, errs, runtime = _run_src(src, nprocs, timeout)
+    _print_result(fname, returncode, out, errs, outstream, errstream)
+    if cache is not None:
+        cache.add(fname, src, nprocs, returncode, out, errs, runtime)
+    return returncode
 
-    print('&' * 20, ' running', fname, ' ' + '&' * 20, file=outstream, flush=True)
-    if show_src:
-        print(src, file=outstream)
-    print('-=' * 40, file=outstream)
-    with open('_junk_.py', 'w') as tmp:
-        tmp.write(src)
-    if nprocs == 1:
-        proc = subprocess.run(['python', '_junk_.py'], text=True, capture_output=True,
-                              timeout=timeout)
-    else:
-        proc = subprocess.run(['mpirun', '-n', str(nprocs), 'python', '_junk_.py'],
-                                text=True, capture_output=True, timeout=timeout)
-    try:
-        os.remove('_junk.py')
-    except OSError:
-        pass
-
-    if proc.returncode != 0:
-        print(f"{fname} return code = {proc.returncode}.", file=errstream)
-    print(proc.stdout, file=outstream)
-    print(proc.stderr, file=errstream)
-    print('-=' * 40, file=outstream)
+
+class _CoreScheduler(object):
+    """
+    Keeps concurrently running notebooks from using more than a given number of cores.
+
+    Attributes
+    ----------
+    ncores : int
+        Total number of cores.
+    free : int
+        Number of cores not currently reserved.
+    cond : threading.Condition
+        Used to wait for cores to be freed.
+    """
+
+    def __init__(self, ncores):
+        self.ncores = ncores
+        self.free = ncores
+        self.cond = threading.Condition()
+
+    @contextmanager
+    def reserve(self, n):
+        # a run needing more than all of the cores just runs alone
+        n = min(n, self.ncores)
+        with self.cond:
+            self.cond.wait_for(lambda: self.free >= n)
+            self.free -= n
+        try:
+            yield
+        finally:
+            with self.cond:
+                self.free += n
+                self.cond.notify_all()
+
+
+def run_notebooks_parallel(notebooks, jobs, nprocs=1, show_src=True, timeout=None,
+                           outstream=sys.stdout, errstream=sys.stderr, ncores=None, cache=None):
+    """
+    Execute python source code from multiple notebooks concurrently.
+
+    Output from each notebook is written as a block when it finishes.  Notebooks using MPI
+    reserve nprocs cores, and notebooks only start when enough cores are free, so MPI runs
+    don't oversubscribe the machine.  MPI notebooks are started first.
+
+    Parameters
+    ----------
+    notebooks : iter of (str, str)
+        Filename and full python source of each notebook.
+    jobs : int
+        Maximum number of notebooks to run at the same time.
+    nprocs : int
+        Number of processes to use for notebooks using MPI.
+    show_src : bool
+        If True, display the full python source to outstream.
+    timeout : float
+        If set, terminate each run after 'timeout' seconds.
+    outstream : file
+        File where output is written.
+    errstream : file
+        File where errors and warnings are written.
+    ncores : int or None
+        Number of cores available.  Defaults to the number of CPUs.
+    cache : NotebookRunCache or None
+        If given, the result of each run is stored here.
+
+    Returns
+    -------
+    dict
+        Return code keyed by notebook filename.
+    """
+    scheduler = _CoreScheduler(ncores or os.cpu_count() or 1)
+    notebooks = sorted(((fname, src, _get_nprocs(src, nprocs)) for fname, src in notebooks),
+                       key=lambda x: x[2], reverse=True)
+
+    def _run(fname, src, np):
+        with scheduler.reserve(np):
+            return _run_src(src, np, timeout)
+
+    returncodes = {}
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(_run, fname, src, np): (fname, src, np)
+                   for fname, src, np in notebooks}
+        for future in as_completed(futures):
+            fname, src, np = futures[future]
+            returncode, out, errs, runtime = future.result()
+            _print_header(fname, src, show_src, outstream)
+            _print_result(fname, returncode, out, errs, outstream, errstream)
+            if cache is not None:
+                cache.add(fname, src, np, returncode, out, errs, runtime)
+            returncodes[fname] = returncode
+
+    return returncodes
 
 
 def _run_notebook_exec(options, user_args):
@@ -331,19 +719,50 @@ def _run_notebook_exec(options, user_args):
         outs = open('run_notebooks.out', 'w')
         errs = open('run_notebooks.err', 'w')
 
-        for fpath, src in grep_notebooks(includes=options.includes,
-                                         greps=options.greps):
-            if options.dryrun:
-                print(fpath)
+        # read everything from the index up front so it can be saved before the runs start
+        index = NotebookIndex(default_index_file())
+        notebooks = list(grep_notebooks(includes=options.includes, greps=options.greps,
+                                        index=index))
+        index.save()
+
+        # skip notebooks that passed last time unless their source or environment changed
+        cache = NotebookRunCache(default_run_cache_file())
+        if not options.rerun:
+            todo = []
+            for fpath, src in notebooks:
+                entry = cache.get_passed(fpath, src, _get_nprocs(src, options.nprocs))
+                if entry is None:
+                    todo.append((fpath, src))
+                elif not options.dryrun:
+                    print(f"{fpath} is unchanged since it passed in {entry['runtime']:.2f} "
+                          "seconds. Skipping.", file=outs)
+            if len(todo) < len(notebooks):
+                print(f"Skipping {len(notebooks) - len(todo)} unchanged notebooks that passed "
+                      "previously.")
+            notebooks = todo
+
+        try:
+            if options.jobs > 1 and not options.dryrun:
+                run_notebooks_parallel(notebooks, options.jobs, nprocs=options.nprocs,
+                                       timeout=options.timeout, outstream=outs, errstream=errs,
+                                       cache=cache)
             else:
-                run_notebook_src(fpath, src, nprocs=options.nprocs, timeout=options.timeout,
-                                 outstream=outs, errstream=errs)
+                for fpath, src in notebooks:
+                    if options.dryrun:
+                        print(fpath)
+                    else:
+                        run_notebook_src(fpath, src, nprocs=options.nprocs,
+                                         timeout=options.timeout, outstream=outs,
+                                         errstream=errs, cache=cache)
+        finally:
+            cache.save()
     else:
 
         if options.includes:
             print("The --include option only works when also using --recurse.")
             sys.exit(-1)
 
+        notebooks = []
         for f in sorted(options.file):
             if os.path.isdir(f):
                 continue
@@ -353,9 +772,15 @@ def _run_notebook_exec(options, user_args):
             if not os.path.isfile(f):
                 print(f"Can't find file '{f}'.")
                 sys.exit(-1)
+            notebooks.append(f)
 
-            src = get_full_notebook_src(f)
-            run_notebook_src(f, src, nprocs=options.nprocs, timeout=options.timeout)
+        if options.jobs > 1:
+            run_notebooks_parallel(((f, get_full_notebook_src(f)) for f in notebooks),
+                                   options.jobs, nprocs=options.nprocs, timeout=options.timeout)
+        else:
+            for f in notebooks:
+                src = get_full_notebook_src(f)
+                run_notebook_src(f, src, nprocs=options.nprocs, timeout=options.timeout)
 
 
 def _run_notebook_setup_parser(parser):
@@ -363,7 +788,8 @@ def _run_notebook_setup_parser(parser):
     parser.add_argument('-r', '--recurse', action='store_true', dest='recurse',
                         help='Search through all directories at or below the current one for the '
                         'specified file(s).  If no files are specified, execute all jupyter '
-                        'notebook files found.')
+                        'notebook files found.  Notebooks that passed on their previous run are '
+                        'skipped if their source and the installed packages are unchanged.')
     parser.add_argument('-i', '--include', action='append', dest='includes',
                         default=[], help='If the --recurse option is active, this specifies a '
                         'local filename or glob pattern to match. This argument may be supplied '
@@ -376,6 +802,13 @@ def _run_notebook_setup_parser(parser):
                         help='The number of processes to use for MPI cases.')
     parser.add_argument('-d', '--dryrun', action='store_true', dest='dryrun',
                         help="Report which notebooks would be run but don't actually run them.")
+    parser.add_argument('--rerun', action='store_true', dest='rerun',
+                        help='When using the --recurse option, run all notebooks, including '
+                        'unchanged notebooks that passed on their previous run.')
+    parser.add_argument('-j', '--jobs', action='store', dest='jobs', default=1, type=int,
+                        help='The number of notebooks to run at the same time. Notebooks using '
+                        'MPI count as nprocs toward the number of cores in use, which is kept '
+                        'at or below the number of CPUs.')
     parser.add_argument('--timeout', action='store', dest='timeout', type=float,
                         help='Timeout in seconds. Run will be terminated if it takes longer than '
                              'timeout.')
@@ -1,79 +1,776 @@
 
+import os
+import sys
+import json
 import atexit
-from functools import wraps, partial
-from inspect import signature
-from collections import Counter, defaultdict
+import inspect
+import importlib
+from random import random
+from time import perf_counter_ns
+from functools import wraps
+from inspect import signature, Parameter
+from collections import Counter
 
+import numpy as np
 
-_total_arg_type_counts = defaultdict(dict)
+from openmdao.utils.file_utils import _load_and_exec
+from openmdao.utils.mpi import MPI
+
+
+# collected _ArgTypeCounts objects, one per decorated function
+_arg_type_counts = []
 _do_atc_atexit = True
 
+# collected _ArrayInfoCounts objects, one per decorated function
+_array_info_counts = []
+_do_ai_atexit = True
+
+# set OM_DEVTOOLS_ARGTYPES=0 to make save_arg_type_counts return the undecorated function
+_atc_enabled = os.environ.get('OM_DEVTOOLS_ARGTYPES', '1') != '0'
+
+
+def _typename(typ):
+    """
+    Return the name of the given type, qualified by its module if it isn't a builtin.
+    """
+    if typ.__module__ == 'builtins':
+        return typ.__qualname__
+    return '%s.%s' % (typ.__module__, typ.__qualname__)
+
+
+class _ArgTypeCounts(object):
+    """
+    Counts of the types passed as each argument of a function.
+
+    Attributes
+    ----------
+    funcname : str
+        Module qualified name of the function.
+    names : list of str
+        Parameter names.
+    counters : list of Counter
+        Counts of each argument type, keyed by type, for each parameter.
+    ncalls : list of int
+        Single entry list holding the total number of calls, sampled or not.
+    nsampled : int
+        Number of calls where arg types were recorded.
+    _npos : int
+        Number of parameters that can be passed by position.
+    _varargs : int or None
+        Index of the *args parameter, if any.
+    _varkw : int or None
+        Index of the **kwargs parameter, if any.
+    _name2idx : dict
+        Index of each parameter that can be passed by keyword.
+    """
+
+    # maps an arg to the key it's counted under
+    _key = type
+
+    def __init__(self, fnc):
+        self.funcname = '%s.%s' % (getattr(fnc, '__module__', '?'),
+                                   getattr(fnc, '__qualname__', fnc.__name__))
+        params = list(signature(fnc).parameters.values())
+        self.names = [p.name for p in params]
+        self.counters = [Counter() for p in params]
+        self.ncalls = [0]
+        self.nsampled = 0
+        self._npos = 0
+        self._varargs = None
+        self._varkw = None
+        self._name2idx = {}
+        for i, p in enumerate(params):
+            if p.kind in (Parameter.POSITIONAL_ONLY, Parameter.POSITIONAL_OR_KEYWORD):
+                self._npos = i + 1
+            elif p.kind == Parameter.VAR_POSITIONAL:
+                self._varargs = i
+            elif p.kind == Parameter.VAR_KEYWORD:
+                self._varkw = i
+            if p.kind in (Parameter.POSITIONAL_OR_KEYWORD, Parameter.KEYWORD_ONLY):
+                self._name2idx[p.name] = i
+
+    def record(self, args, kwargs):
+        """
+        Record the types of the given args, binding each to its parameter.
+        """
+        self.nsampled += 1
+        counters = self.counters
+        npos = self._npos
+        key = self._key
+        for i, a in enumerate(args):
+            if i < npos:
+                counters[i][key(a)] += 1
+            elif self._varargs is not None:
+                counters[self._varargs][key(a)] += 1
+        for name, val in kwargs.items():
+            idx = self._name2idx.get(name, self._varkw)
+            if idx is not None:
+                counters[idx][key(val)] += 1
+
+    def get_data(self):
+        """
+        Return the counts as a dict with type names instead of types.
+        """
+        return {
+            'function': self.funcname,
+            'ncalls': self.ncalls[0],
+            'nsampled': self.nsampled,
+            'args': {n: [(_typename(t), c) for t, c in counter.most_common()]
+                     for n, counter in zip(self.names, self.counters) if counter},
+        }
+
+
+def _get_typ_count_data():
+    """
+    Return collected arg type counts, merged by function name and sorted by call count.
+    """
+    merged = {}
+    for counts in _arg_type_counts:
+        if counts.nsampled == 0:
+            continue
+        data = counts.get_data()
+        if data['function'] in merged:
+            old = merged[data['function']]
+            old['ncalls'] += data['ncalls']
+            old['nsampled'] += data['nsampled']
+            for n, lst in data['args'].items():
+                counter = Counter(dict(old['args'].get(n, ())))
+                counter.update(dict(lst))
+                old['args'][n] = counter.most_common()
+        else:
+            merged[data['function']] = data
+    return sorted(merged.values(), key=lambda d: d['ncalls'], reverse=True)
+
 
 def _dump_typ_counts():
     """
     Take any collected arg type counts and print them out.
     """
-    global _total_arg_type_counts
-    if _total_arg_type_counts:
-        for funcname, counters in _total_arg_type_counts.items():
-            keep = False
-            for counter in counters.values():
-                if counter:
-                    keep = True
-                    break
-            if keep:
-                print("Function", funcname)
-                for argname, counter in counters.items():
-                    if counter:
-                        print(f"{argname}:", counter.most_common())
-
-
-def _save_typ_counts_atexit(funcname, type_counts):
-    global _total_arg_type_counts
-    counts = _total_arg_type_counts[funcname]
-    if not counts:
-        for n, c in type_counts:
-            counts[n] = c
+    for data in _get_typ_count_data():
+        print("Function", data['function'], "(%d calls, %d sampled)" % (data['ncalls'],
+                                                                        data['nsampled']))
+        for argname, counts in data['args'].items():
+            print(f"{argname}:", counts)
+
+
+def _arg_type_wrapper(fnc, sample=1, fraction=None, counts=None):
+    """
+    Return a wrapper for fnc that records arg type counts.
+
+    Parameters
+    ----------
+    fnc : function
+        The function to be wrapped.
+    sample : int
+        Record the arg types of every sample'th call.
+    fraction : float or None
+        If not None, record the arg types of a random fraction of calls instead.
+    counts : _ArgTypeCounts or None
+        Where calls are recorded.  If None, a new _ArgTypeCounts is created.
+
+    Returns
+    -------
+    function
+        The function wrapper.
+    """
+    if counts is None:
+        counts = _ArgTypeCounts(fnc)
+        _arg_type_counts.append(counts)
+    record = counts.record
+    ncalls = counts.ncalls
+
+    if fraction is not None:
+        @wraps(fnc)
+        def _wrap(*args, **kwargs):
+            ncalls[0] += 1
+            if random() < fraction:
+                record(args, kwargs)
+            return fnc(*args, **kwargs)
+    elif sample > 1:
+        @wraps(fnc)
+        def _wrap(*args, **kwargs):
+            ncalls[0] += 1
+            if ncalls[0] % sample == 0:
+                record(args, kwargs)
+            return fnc(*args, **kwargs)
     else:
-        cdict = counts
-        for n, cnt in type_counts:
-            if n not in cdict:
-                cdict[n] = cnt
-            else:
-                cdict[n].update(cnt)
+        @wraps(fnc)
+        def _wrap(*args, **kwargs):
+            ncalls[0] += 1
+            record(args, kwargs)
+            return fnc(*args, **kwargs)
+
+    return _wrap
 
 
-def save_arg_type_counts(fnc):
+def save_arg_type_counts(fnc=None, sample=1, fraction=None):
     """
     Keep track of the count of the types passed as each argument of a decorated function.
 
+    Can be used as @save_arg_type_counts or, to only record some of the calls, as
+    @save_arg_type_counts(sample=N) or @save_arg_type_counts(fraction=F).  If the
+    OM_DEVTOOLS_ARGTYPES environment variable is '0', the function is returned undecorated.
+
     Parameters
     ----------
     fnc : function
         The function to be decorated.
+    sample : int
+        Record the arg types of every sample'th call.
+    fraction : float or None
+        If not None, record the arg types of a random fraction of calls instead.
 
     Returns
     -------
     function
         The function wrapper.
     """
+    if fnc is None:
+        return lambda f: save_arg_type_counts(f, sample=sample, fraction=fraction)
+
+    if not _atc_enabled:
+        return fnc
+
     global _do_atc_atexit
     if _do_atc_atexit:
-        # register _dump_typ_counts before any save_arg_type_counts is called so
-        # _dump_typ_counts will always be called last.
         atexit.register(_dump_typ_counts)
         _do_atc_atexit = False
 
-    _typcounts = [(n, Counter()) for n in signature(fnc).parameters]
-    atexit.register(partial(_save_typ_counts_atexit, fnc.__name__, _typcounts))
+    return _arg_type_wrapper(fnc, sample=sample, fraction=fraction)
+
+
+def _array_key(val):
+    """
+    Return (dtype, ndim, size bucket, layout, is_view) for an ndarray, else None.
+
+    The size bucket is the smallest power of 2 that is >= the size of the array.
+    """
+    if not isinstance(val, np.ndarray):
+        return None
+    flags = val.flags
+    if flags.c_contiguous:
+        layout = 'C'
+    elif flags.f_contiguous:
+        layout = 'F'
+    else:
+        layout = 'noncontig'
+    size = val.size
+    return (val.dtype.str, val.ndim, 1 << (size - 1).bit_length() if size else 0, layout,
+            val.base is not None)
+
+
+class _ArrayInfoCounts(_ArgTypeCounts):
+    """
+    Counts of the dtype, shape, memory layout and view status of ndarray args of a function.
+
+    Attributes
+    ----------
+    threshold : float
+        An arg is flagged if at least this fraction of its arrays are non-contiguous or
+        have a different dtype from the most common one.
+    """
+
+    _key = staticmethod(_array_key)
+
+    def __init__(self, fnc, threshold=0.1):
+        super(_ArrayInfoCounts, self).__init__(fnc)
+        self.threshold = threshold
+
+    def get_data(self):
+        """
+        Return the array info for each ndarray arg along with any warning flags.
+        """
+        args = {}
+        flags = {}
+        for n, counter in zip(self.names, self.counters):
+            total = sum(c for key, c in counter.items() if key is not None)
+            if total == 0:
+                continue
+            dtypes = Counter()
+            noncontig = 0
+            infos = []
+            for key, c in counter.most_common():
+                if key is None:
+                    continue
+                dtype, ndim, size, layout, view = key
+                infos.append({'dtype': dtype, 'ndim': ndim, 'max_size': size, 'layout': layout,
+                              'view': view, 'count': c})
+                dtypes[dtype] += c
+                if layout == 'noncontig':
+                    noncontig += c
+            args[n] = infos
+
+            msgs = []
+            if noncontig >= self.threshold * total:
+                msgs.append("%.0f%% non-contiguous" % (noncontig / total * 100.))
+            if len(dtypes) > 1:
+                odd = total - dtypes.most_common(1)[0][1]
+                if odd >= self.threshold * total:
+                    msgs.append("mixed dtypes: %s" % ', '.join('%s %.0f%%' % (d, c / total * 100.)
+                                                              for d, c in dtypes.most_common()))
+            if msgs:
+                flags[n] = msgs
+
+        return {
+            'function': self.funcname,
+            'ncalls': self.ncalls[0],
+            'nsampled': self.nsampled,
+            'args': args,
+            'flags': flags,
+        }
+
+
+def _get_array_info_data():
+    """
+    Return collected array info for functions that received arrays, sorted by call count.
+    """
+    data = [counts.get_data() for counts in _array_info_counts if counts.nsampled > 0]
+    return sorted((d for d in data if d['args']), key=lambda d: d['ncalls'], reverse=True)
+
+
+def _dump_array_info():
+    """
+    Take any collected array info and print it out, flagged functions first.
+    """
+    data = _get_array_info_data()
+    for d in sorted(data, key=lambda d: not d['flags']):
+        print("Function", d['function'], "(%d calls, %d sampled)" % (d['ncalls'], d['nsampled']))
+        for argname, msgs in d['flags'].items():
+            print("  WARNING: %s: %s" % (argname, '; '.join(msgs)))
+        for argname, infos in d['args'].items():
+            print("  %s:" % argname)
+            for info in infos:
+                print("    {count:>8}  dtype={dtype} ndim={ndim} size<={max_size} "
+                      "layout={layout} view={view}".format(**info))
+
+
+def save_array_info(fnc=None, sample=1, fraction=None, threshold=0.1):
+    """
+    Keep track of the dtype, shape, memory layout and view status of ndarray args.
+
+    This is a companion to save_arg_type_counts for numerical code.  At exit, args that
+    frequently receive non-contiguous arrays or arrays of an unexpected dtype, either of
+    which can cause hidden copies or conversions, are flagged.  Sampling and the
+    OM_DEVTOOLS_ARGTYPES environment variable work as they do for save_arg_type_counts.
+
+    Parameters
+    ----------
+    fnc : function
+        The function to be decorated.
+    sample : int
+        Record the array info of every sample'th call.
+    fraction : float or None
+        If not None, record the array info of a random fraction of calls instead.
+    threshold : float
+        Flag an arg if at least this fraction of its arrays are non-contiguous or of a
+        different dtype than the most common one.
+
+    Returns
+    -------
+    function
+        The function wrapper.
+    """
+    if fnc is None:
+        return lambda f: save_array_info(f, sample=sample, fraction=fraction,
+                                         threshold=threshold)
+
+    if not _atc_enabled:
+        return fnc
+
+    global _do_ai_atexit
+    if _do_ai_atexit:
+        atexit.register(_dump_array_info)
+        _do_ai_atexit = False
+
+    counts = _ArrayInfoCounts(fnc, threshold)
+    _array_info_counts.append(counts)
+    return _arg_type_wrapper(fnc, sample=sample, fraction=fraction, counts=counts)
+
+
+# number of histogram buckets used by time_calls.  Times below 8 ns each get their own bucket
+# and every power of 2 above that is split into 4 sub-buckets.
+_NBUCKETS = 64 * 4 + 4
+
+# collected _CallTimes objects, one per decorated function
+_call_times = []
+_do_tc_atexit = True
+
+# set OM_DEVTOOLS_TIME_CALLS=0 to make time_calls return the undecorated function
+_tc_enabled = os.environ.get('OM_DEVTOOLS_TIME_CALLS', '1') != '0'
+
+
+def _bucket_upper(idx):
+    """
+    Return the largest time in ns that falls in the given histogram bucket.
+    """
+    if idx < 8:
+        return idx
+    b = idx >> 2
+    return ((5 + (idx & 3)) << (b - 3)) - 1
+
+
+def _hist_percentiles(hist, percentiles):
+    """
+    Return the upper bound of the bucket containing each of the given percentiles.
+    """
+    counts = np.asarray(hist)
+    total = np.sum(counts)
+    if total == 0:
+        return [0] * len(percentiles)
+    cum = np.cumsum(counts)
+    return [_bucket_upper(int(np.searchsorted(cum, p / 100. * total))) for p in percentiles]
+
+
+class _CallTimes(object):
+    """
+    Histogram of call latencies of a function, optionally split by caller.
+
+    Attributes
+    ----------
+    funcname : str
+        Module qualified name of the function.
+    hist : list of int
+        Number of calls in each log spaced time bucket.
+    stats : list of int
+        Total and max time in ns.
+    callers : dict or None
+        Histogram for each (filename, line, function) of the caller, if tracking callers.
+    """
+
+    def __init__(self, fnc, by_caller=False):
+        self.funcname = '%s.%s' % (getattr(fnc, '__module__', '?'),
+                                   getattr(fnc, '__qualname__', fnc.__name__))
+        self.hist = [0] * _NBUCKETS
+        self.stats = [0, 0]
+        self.callers = {} if by_caller else None
+
+
+def _merge_call_times(timers):
+    """
+    Return the given _CallTimes merged by function name as a dict of plain data.
+    """
+    merged = {}
+    for t in timers:
+        if t.funcname not in merged:
+            merged[t.funcname] = {'hist': np.zeros(_NBUCKETS, dtype=np.int64), 'total': 0,
+                                  'max': 0, 'callers': {}}
+        d = merged[t.funcname]
+        d['hist'] += t.hist
+        d['total'] += t.stats[0]
+        d['max'] = max(d['max'], t.stats[1])
+        for key, hist in (t.callers or {}).items():
+            key = '%s:%d (%s)' % key
+            if key in d['callers']:
+                d['callers'][key] += hist
+            else:
+                d['callers'][key] = np.array(hist, dtype=np.int64)
+    return merged
+
+
+def _get_call_time_data(merged):
+    """
+    Return summary data, including percentiles, for merged call times sorted by total time.
+    """
+    data = []
+    for funcname, d in merged.items():
+        ncalls = int(np.sum(d['hist']))
+        if ncalls == 0:
+            continue
+        # bucket upper bounds can be larger than the actual max
+        mx = int(d['max'])
+        p50, p90, p99 = [min(p, mx) for p in _hist_percentiles(d['hist'], (50, 90, 99))]
+        callers = []
+        for key, hist in d['callers'].items():
+            cp50, cp90, cp99 = [min(p, mx) for p in _hist_percentiles(hist, (50, 90, 99))]
+            callers.append({'caller': key, 'ncalls': int(np.sum(hist)), 'p50': cp50,
+                            'p90': cp90, 'p99': cp99})
+        data.append({
+            'function': funcname,
+            'ncalls': ncalls,
+            'total': int(d['total']),
+            'mean': d['total'] / ncalls,
+            'p50': p50,
+            'p90': p90,
+            'p99': p99,
+            'max': mx,
+            'hist': {str(_bucket_upper(i)): int(c) for i, c in enumerate(d['hist']) if c},
+            'callers': sorted(callers, key=lambda c: c['ncalls'], reverse=True),
+        })
+    return sorted(data, key=lambda d: d['total'], reverse=True)
+
+
+def _dump_call_times():
+    """
+    Merge call times across MPI ranks, then print them and write them to a JSON file.
+
+    The JSON file name is taken from the OM_DEVTOOLS_TIME_CALLS_FILE environment variable
+    and defaults to time_calls.json.
+    """
+    merged = _merge_call_times(_call_times)
+
+    if MPI and MPI.COMM_WORLD.size > 1:
+        all_merged = MPI.COMM_WORLD.gather(merged, root=0)
+        if MPI.COMM_WORLD.rank != 0:
+            return
+        merged = {}
+        for rank_merged in all_merged:
+            for funcname, d in rank_merged.items():
+                if funcname not in merged:
+                    merged[funcname] = d
+                    continue
+                m = merged[funcname]
+                m['hist'] += d['hist']
+                m['total'] += d['total']
+                m['max'] = max(m['max'], d['max'])
+                for key, hist in d['callers'].items():
+                    if key in m['callers']:
+                        m['callers'][key] += hist
+                    else:
+                        m['callers'][key] = hist
+
+    data = _get_call_time_data(merged)
+    if not data:
+        return
+
+    template = "{0:>10} {1:>12} {2:>12} {3:>12} {4:>12} {5:>12} {6:>12}  {7}"
+    print(template.format('ncalls', 'total (s)', 'mean (us)', 'p50 (us)', 'p90 (us)',
+                          'p99 (us)', 'max (us)', 'function'))
+    for d in data:
+        print(template.format(d['ncalls'], '%.6f' % (d['total'] * 1e-9),
+                              '%.3f' % (d['mean'] * 1e-3), '%.3f' % (d['p50'] * 1e-3),
+                              '%.3f' % (d['p90'] * 1e-3), '%.3f' % (d['p99'] * 1e-3),
+                              '%.3f' % (d['max'] * 1e-3), d['function']))
+        for c in d['callers']:
+            print(template.format(c['ncalls'], '', '', '%.3f' % (c['p50'] * 1e-3),
+                                  '%.3f' % (c['p90'] * 1e-3), '%.3f' % (c['p99'] * 1e-3), '',
+                                  '    called from ' + c['caller']))
+
+    fname = os.environ.get('OM_DEVTOOLS_TIME_CALLS_FILE', 'time_calls.json')
+    with open(fname, 'w') as f:
+        json.dump(data, f, indent=1)
+
+
+def time_calls(fnc=None, by_caller=False):
+    """
+    Record the latency of each call of the decorated function in a log spaced histogram.
+
+    At exit, the number of calls, total and mean time and the p50, p90, p99 and max latency
+    of each decorated function are printed and written to a JSON file.  Under MPI, the
+    histograms of all ranks are merged on rank 0.  Percentiles are the upper bounds of their
+    histogram buckets, which are 1/4 of a power of 2 wide, so they may be high by up to 25%.
+
+    Can be used as @time_calls or @time_calls(by_caller=True) to also keep a histogram for
+    each calling line.  If the OM_DEVTOOLS_TIME_CALLS environment variable is '0', the
+    function is returned undecorated.
+
+    Parameters
+    ----------
+    fnc : function
+        The function to be decorated.
+    by_caller : bool
+        If True, also keep a histogram for each calling line.  This adds a frame lookup and a
+        dict lookup to each call.
+
+    Returns
+    -------
+    function
+        The function wrapper.
+    """
+    if fnc is None:
+        return lambda f: time_calls(f, by_caller=by_caller)
+
+    if not _tc_enabled:
+        return fnc
+
+    global _do_tc_atexit
+    if _do_tc_atexit:
+        atexit.register(_dump_call_times)
+        _do_tc_atexit = False
+
+    timer = _CallTimes(fnc, by_caller)
+    _call_times.append(timer)
+    hist = timer.hist
+    stats = timer.stats
+    clock = perf_counter_ns
+
+    if by_caller:
+        callers = timer.callers
+        getframe = sys._getframe
+
+        @wraps(fnc)
+        def _wrap(*args, **kwargs):
+            start = clock()
+            try:
+                return fnc(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                stats[0] += elapsed
+                if elapsed > stats[1]:
+                    stats[1] = elapsed
+                b = elapsed.bit_length()
+                idx = (b << 2) | ((elapsed >> (b - 3)) & 3) if b > 3 else elapsed
+                hist[idx] += 1
+                frame = getframe(1)
+                key = (frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name)
+                if key not in callers:
+                    callers[key] = [0] * _NBUCKETS
+                callers[key][idx] += 1
+    else:
+        @wraps(fnc)
+        def _wrap(*args, **kwargs):
+            start = clock()
+            try:
+                return fnc(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                stats[0] += elapsed
+                if elapsed > stats[1]:
+                    stats[1] = elapsed
+                b = elapsed.bit_length()
+                hist[(b << 2) | ((elapsed >> (b - 3)) & 3) if b > 3 else elapsed] += 1
 
-    @wraps(fnc)
-    def _wrap(*args, **kwargs):
-        for i, a in enumerate(args):
-            _typcounts[i][1][type(a).__name__] += 1
-        for i, val in enumerate(kwargs.values()):
-            _typcounts[i][1][type(val).__name__] += 1
-        return fnc(*args, **kwargs)
     return _wrap
 
 
+def _import_target(target):
+    """
+    Return the module or class with the given dotted name.
+    """
+    try:
+        return importlib.import_module(target)
+    except ImportError:
+        modname, _, clsname = target.rpartition('.')
+        if not modname:
+            raise
+        return getattr(_import_target(modname), clsname)
+
+
+def _wrap_class(cls, sample, fraction, seen):
+    count = 0
+    for name, member in list(vars(cls).items()):
+        if name.startswith('__') and name.endswith('__') and name not in ('__init__',
+                                                                          '__call__'):
+            continue
+        if isinstance(member, (staticmethod, classmethod)):
+            if inspect.isfunction(member.__func__) and member.__func__ not in seen:
+                seen.add(member.__func__)
+                setattr(cls, name, type(member)(_arg_type_wrapper(member.__func__, sample,
+                                                                  fraction)))
+                count += 1
+        elif inspect.isfunction(member) and member not in seen:
+            seen.add(member)
+            setattr(cls, name, _arg_type_wrapper(member, sample, fraction))
+            count += 1
+    return count
+
+
+def wrap_arg_type_counts(target, sample=1, fraction=None):
+    """
+    Record arg type counts for every function and method in the given module or class.
+
+    For a module, the functions and classes defined in it (not imported into it) are wrapped.
+    Functions are replaced in the module namespace, so modules that have already imported
+    a function by name will still call the unwrapped version.  Methods are replaced on their
+    class, so they are always counted.
+
+    Parameters
+    ----------
+    target : str
+        Dotted name of a module or class.
+    sample : int
+        Record the arg types of every sample'th call.
+    fraction : float or None
+        If not None, record the arg types of a random fraction of calls instead.
+
+    Returns
+    -------
+    int
+        The number of functions and methods wrapped.
+    """
+    obj = _import_target(target)
+    seen = set()
+
+    if inspect.isclass(obj):
+        return _wrap_class(obj, sample, fraction, seen)
+
+    count = 0
+    for name, member in list(vars(obj).items()):
+        if getattr(member, '__module__', None) != obj.__name__:
+            continue
+        if inspect.isclass(member):
+            count += _wrap_class(member, sample, fraction, seen)
+        elif inspect.isfunction(member) and member not in seen:
+            seen.add(member)
+            setattr(obj, name, _arg_type_wrapper(member, sample, fraction))
+            count += 1
+    return count
+
+
+def _dump_typ_counts_json(fname):
+    """
+    Write collected arg type counts, sorted by call count, to the given JSON file.
+    """
+    with open(fname, 'w') as f:
+        json.dump(_get_typ_count_data(), f, indent=1)
+    print("Arg type counts written to %s" % fname)
+
+
+def _argtypes_setup_parser(parser):
+    """
+    Set up the openmdao subparser for the 'openmdao argtypes' command.
+
+    Parameters
+    ----------
+    parser : argparse subparser
+        The parser we're adding options to.
+    """
+    parser.add_argument('file', nargs=1, help='Python script or test to run.')
+    parser.add_argument('-t', '--target', action='append', dest='targets', default=[],
+                        help='Dotted name of a module or class whose functions and methods '
+                        'will be wrapped. May be given multiple times.')
+    parser.add_argument('-o', default='argtypes.json', action='store', dest='outfile',
+                        help='Name of the JSON output file. Defaults to argtypes.json. Under '
+                        'MPI, the rank is appended to the name.')
+    parser.add_argument('--sample', action='store', type=int, default=1, dest='sample',
+                        help='Record the arg types of every Nth call of each function.')
+    parser.add_argument('--fraction', action='store', type=float, default=None,
+                        dest='fraction',
+                        help='Record the arg types of a random fraction of calls instead.')
+
+
+def _argtypes_exec(options, user_args):
+    """
+    Wrap the targets, then run the script and write arg type counts at exit.
+
+    Parameters
+    ----------
+    options : argparse Namespace
+        Command line options.
+    user_args : list of str
+        Args to be passed to the user script.
+    """
+    if not options.targets:
+        print("No targets given. Use --target to specify modules or classes.", file=sys.stderr)
+        sys.exit(-1)
+
+    for target in options.targets:
+        count = wrap_arg_type_counts(target, sample=options.sample, fraction=options.fraction)
+        print("Wrapped %d functions in %s" % (count, target))
+
+    outfile = options.outfile
+    if MPI and MPI.COMM_WORLD.size > 1:
+        outfile = '%s.%d' % (outfile, MPI.COMM_WORLD.rank)
+    atexit.register(_dump_typ_counts_json, outfile)
+
+    _load_and_exec(options.file[0], user_args)
+
+
+def _argtypes_setup():
+    """
+    A command to count the arg types passed to functions in the given modules or classes.
+    """
+    return (
+        _argtypes_setup_parser,
+        _argtypes_exec,
+        "Count the types of args passed to every function in the given modules or classes."
+        )
@@ -0,0 +1,59 @@
+"""Define a class to sort and filter the rows of tables that are paged by a web viewer."""
+
+
+class TableOrders(object):
+    """
+    Cache of row orders for a table that is sorted and filtered on the server.
+
+    The tables in the viewers are loaded a page at a time, so the same sort and filter are
+    requested over and over while paging or scrolling.  Orders are cached so that only the
+    first request for a given sort and filter pays for it.
+
+    Attributes
+    ----------
+    _sort : function
+        Called as sort(field) to return row indices sorted in ascending order on field.
+    _match : function
+        Called as match(filt, order) to return a bool array that is True for each row in order
+        that matches the lower case filter string.
+    _maxsize : int
+        The cache is cleared when it has more than this many entries.
+    _orders : dict
+        Cached row orders keyed on (field, direction, filter).
+    """
+
+    def __init__(self, sort, match, maxsize=20):
+        self._sort = sort
+        self._match = match
+        self._maxsize = maxsize
+        self._orders = {}
+
+    def get(self, field, direction, filt):
+        """
+        Return row indices sorted on the given field and filtered by the given string.
+
+        Parameters
+        ----------
+        field : str
+            Name of the field to sort on.
+        direction : str
+            Either 'asc' or 'desc'.
+        filt : str
+            If not empty, only rows matching this string are included.
+
+        Returns
+        -------
+        ndarray
+            Row indices.
+        """
+        key = (field, direction, filt)
+        if key not in self._orders:
+            order = self._sort(field)
+            if direction == 'desc':
+                order = order[::-1]
+            if filt:
+                order = order[self._match(filt.lower(), order)]
+            if len(self._orders) > self._maxsize:
+                self._orders.clear()
+            self._orders[key] = order
+        return self._orders[key]
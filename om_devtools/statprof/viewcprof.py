@@ -0,0 +1,195 @@
+"""Define a function to view cProfile (pstats) data in a browser."""
+import os
+import json
+import pstats
+
+import numpy as np
+import tornado.web
+import tornado.ioloop
+
+from om_devtools.statprof.viewstatprof import launch_browser, startThread
+from om_devtools.statprof.tableorder import TableOrders
+from om_devtools.cache_utils import load_cache, save_cache
+
+
+_num_fields = ('ncalls', 'primcalls', 'tottime', 'cumtime', 'percall_tot', 'percall_cum')
+
+
+def _load_cprof_data(stats_file):
+    """
+    Return the function table and call graph for the given pstats file.
+
+    The parsed data is cached in <stats_file>.viewcache, keyed on the size and modification time
+    of the pstats file, so large profiles only have to be parsed once.
+
+    Parameters
+    ----------
+    stats_file : str
+        Name of the pstats file.
+
+    Returns
+    -------
+    dict
+        The parsed profile data.
+    """
+    st = os.stat(stats_file)
+    key = (st.st_size, st.st_mtime)
+    cache_file = stats_file + '.viewcache'
+
+    data = load_cache(cache_file)
+    if isinstance(data, dict) and data.get('key') == key:
+        return data
+
+    stats = pstats.Stats(stats_file).stats
+    funcs = list(stats)
+    func2idx = {f: i for i, f in enumerate(funcs)}
+
+    cols = {name: np.zeros(len(funcs)) for name in _num_fields}
+    callers = [[] for f in funcs]
+    callees = [[] for f in funcs]
+    for i, func in enumerate(funcs):
+        cc, nc, tt, ct, fcallers = stats[func]
+        cols['ncalls'][i] = nc
+        cols['primcalls'][i] = cc
+        cols['tottime'][i] = tt
+        cols['cumtime'][i] = ct
+        for caller, cstats in fcallers.items():
+            # cstats is (cc, nc, tt, ct) for the time spent in func when called from caller
+            entry = (func2idx[caller],) + tuple(cstats)
+            callers[i].append(entry)
+            callees[entry[0]].append((i,) + tuple(cstats))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cols['percall_tot'] = np.nan_to_num(cols['tottime'] / cols['ncalls'])
+        cols['percall_cum'] = np.nan_to_num(cols['cumtime'] / cols['primcalls'])
+
+    data = {
+        'key': key,
+        'names': [pstats.func_std_string(f) for f in funcs],
+        'cols': cols,
+        'callers': callers,
+        'callees': callees,
+    }
+
+    save_cache(cache_file, data)
+
+    return data
+
+
+class Application(tornado.web.Application):
+    def __init__(self, stats_file, data):
+        self.stats_file = stats_file
+        self.data = data
+        self.lower_names = [n.lower() for n in data['names']]
+        self.orders = TableOrders(self._sort, self._match)
+
+        handlers = [
+            (r"/", Index),
+            (r"/functions", Functions),
+            (r"^/func/([0-9]+)$", Func),
+        ]
+
+        settings = dict(
+             template_path=os.path.join(os.path.dirname(__file__), "templates"),
+             static_path=os.path.join(os.path.dirname(__file__), "static"),
+        )
+
+        super(Application, self).__init__(handlers, **settings)
+
+    def _sort(self, field):
+        if field in _num_fields:
+            return np.argsort(self.data['cols'][field], kind='stable')
+        return np.array(sorted(range(len(self.data['names'])),
+                               key=lambda i: self.data['names'][i]), dtype=int)
+
+    def _match(self, filt, order):
+        names = self.lower_names
+        return np.array([filt in names[i] for i in order], dtype=bool)
+
+    def get_order(self, field, direction, filt):
+        """
+        Return function indices sorted on the given field and filtered by name.
+        """
+        return self.orders.get(field, direction, filt)
+
+    def row(self, i):
+        cols = self.data['cols']
+        row = {name: float(cols[name][i]) for name in _num_fields}
+        row['ncalls'] = int(row['ncalls'])
+        row['primcalls'] = int(row['primcalls'])
+        row['id'] = int(i)
+        row['name'] = self.data['names'][i]
+        return row
+
+
+class Index(tornado.web.RequestHandler):
+    def get(self):
+        self.render('cprof_index.html', cprof_data={'srcfile': self.application.stats_file})
+
+
+class Functions(tornado.web.RequestHandler):
+    """
+    Serve one page of the sorted and filtered function table as JSON.
+    """
+
+    def get(self):
+        app = self.application
+        page = int(self.get_argument('page', '1'))
+        size = int(self.get_argument('size', '100'))
+        field = self.get_argument('sorters[0][field]', 'cumtime')
+        direction = self.get_argument('sorters[0][dir]', 'desc')
+        filt = self.get_argument('filters[0][value]', '')
+
+        order = app.get_order(field, direction, filt)
+        start = (page - 1) * size
+        self.set_header('Content-Type', 'application/json')
+        self.write(json.dumps({
+            'last_page': max(1, (len(order) + size - 1) // size),
+            'data': [app.row(i) for i in order[start:start + size]],
+        }))
+
+
+class Func(tornado.web.RequestHandler):
+    """
+    Show the callers and callees of a single function.
+    """
+
+    def get(self, ident):
+        app = self.application
+        idx = int(ident)
+        names = app.data['names']
+
+        def _rows(entries):
+            return [{'id': int(i), 'name': names[i], 'primcalls': cc, 'ncalls': nc,
+                     'tottime': tt, 'cumtime': ct} for i, cc, nc, tt, ct in entries]
+
+        self.render('cprof_func.html', cprof_data={
+            'func': app.row(idx),
+            'callers': _rows(app.data['callers'][idx]),
+            'callees': _rows(app.data['callees'][idx]),
+        })
+
+
+def view_cprof(stats_file, port=8009):
+    """
+    Start a web server to view the given pstats file and pop up a browser.
+
+    Parameters
+    ----------
+    stats_file : str
+        Name of the pstats file.
+    port : int
+        Web server port.
+    """
+    data = _load_cprof_data(stats_file)
+
+    app = Application(stats_file, data)
+    app.listen(port)
+
+    print("starting server on port %d" % port)
+
+    serve_thread = startThread(tornado.ioloop.IOLoop.current().start)
+    launch_thread = startThread(lambda: launch_browser(port))
+
+    while serve_thread.is_alive():
+        serve_thread.join(timeout=1)
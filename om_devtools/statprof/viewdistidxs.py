@@ -0,0 +1,191 @@
+"""Define a function to view the layout of distributed vectors in a browser."""
+import os
+import json
+
+import numpy as np
+import tornado.web
+import tornado.ioloop
+
+from om_devtools.statprof.viewstatprof import launch_browser, startThread
+from om_devtools.statprof.tableorder import TableOrders
+
+
+_sort_fields = ('name', 'rank', 'start', 'size')
+
+
+class _VecBlocks(object):
+    """
+    Server side indexes over the nonzero (rank, variable) blocks of one vector.
+
+    Attributes
+    ----------
+    names : list of str
+        Absolute variable names.
+    lower_names : list of str
+        Lower case variable names, used for searching.
+    ranks : ndarray
+        Rank of each block.
+    ivars : ndarray
+        Variable index of each block.
+    starts : ndarray
+        Starting global index of each block.
+    sizes : ndarray
+        Size of each block.
+    rank_totals : ndarray
+        Total local size on each rank.
+    orders : TableOrders
+        Cached block orders.
+    _name_order : ndarray
+        Position of each variable when sorted by name.
+    """
+
+    def __init__(self, names, sizes, offsets):
+        self.names = names
+        self.lower_names = [n.lower() for n in names]
+        self.ranks, self.ivars = np.nonzero(sizes)
+        self.starts = offsets[self.ranks, self.ivars]
+        self.sizes = sizes[self.ranks, self.ivars]
+        self.rank_totals = np.sum(sizes, axis=1, dtype=np.int64)
+        self._name_order = np.empty(len(names), dtype=int)
+        self._name_order[np.argsort(np.array(names, dtype=str), kind='stable')] = \
+            np.arange(len(names))
+        self.orders = TableOrders(self._sort, self._match)
+
+    def _sort(self, field):
+        if field == 'name':
+            return np.argsort(self._name_order[self.ivars], kind='stable')
+        elif field == 'rank':
+            return np.argsort(self.ranks, kind='stable')
+        elif field == 'size':
+            return np.argsort(self.sizes, kind='stable')
+        # blocks are already in order of their starting index
+        return np.arange(self.starts.size)
+
+    def _match(self, filt, order):
+        matches = np.array([filt in n for n in self.lower_names], dtype=bool)
+        return matches[self.ivars[order]]
+
+    def get_order(self, field, direction, filt):
+        """
+        Return block indices sorted on the given field and filtered by variable name.
+
+        Parameters
+        ----------
+        field : str
+            Name of the field to sort on.
+        direction : str
+            Either 'asc' or 'desc'.
+        filt : str
+            Only blocks of variables whose name contains this string are included.
+
+        Returns
+        -------
+        ndarray
+            Block indices.
+        """
+        return self.orders.get(field, direction, filt)
+
+    def row(self, i):
+        start = int(self.starts[i])
+        size = int(self.sizes[i])
+        return {
+            'name': self.names[self.ivars[i]],
+            'rank': int(self.ranks[i]),
+            'start': start,
+            'end': start + size - 1,
+            'size': size,
+        }
+
+
+class Application(tornado.web.Application):
+    def __init__(self, layout, title):
+        self.layout = layout
+        self.title = title
+        self.vecs = {io: _VecBlocks(layout.names[io], layout.sizes[io], layout.offsets[io])
+                     for io in ('output', 'input')}
+
+        handlers = [
+            (r"/", Index),
+            (r"^/blocks/(input|output)$", Blocks),
+            (r"^/find/(input|output)/([0-9]+)$", Find),
+        ]
+
+        settings = dict(
+             template_path=os.path.join(os.path.dirname(__file__), "templates"),
+             static_path=os.path.join(os.path.dirname(__file__), "static"),
+        )
+
+        super(Application, self).__init__(handlers, **settings)
+
+
+class Index(tornado.web.RequestHandler):
+    def get(self):
+        app = self.application
+        self.render('dist_idxs.html', dist_data={
+            'title': app.title,
+            'rank_totals': {io: vec.rank_totals.tolist() for io, vec in app.vecs.items()},
+        })
+
+
+class Blocks(tornado.web.RequestHandler):
+    """
+    Serve one chunk of the sorted and filtered variable table of a vector as JSON.
+    """
+
+    def get(self, io):
+        vec = self.application.vecs[io]
+        page = int(self.get_argument('page', '1'))
+        size = int(self.get_argument('size', '200'))
+        field = self.get_argument('sorters[0][field]', 'start')
+        direction = self.get_argument('sorters[0][dir]', 'asc')
+        filt = self.get_argument('filters[0][value]', '')
+        if field not in _sort_fields:
+            field = 'start'
+
+        order = vec.get_order(field, direction, filt)
+        start = (page - 1) * size
+        self.set_header('Content-Type', 'application/json')
+        self.write(json.dumps({
+            'last_page': max(1, (len(order) + size - 1) // size),
+            'data': [vec.row(i) for i in order[start:start + size]],
+        }))
+
+
+class Find(tornado.web.RequestHandler):
+    """
+    Return the variable, rank and local index that own a global index.
+    """
+
+    def get(self, io, idx):
+        self.set_header('Content-Type', 'application/json')
+        try:
+            name, rank, local = self.application.layout.find(io, int(idx))
+        except IndexError as err:
+            self.write(json.dumps({'error': str(err)}))
+        else:
+            self.write(json.dumps({'name': name, 'rank': rank, 'local': local}))
+
+
+def view_dist_idxs(layout, title='', port=8009):
+    """
+    Start a web server to view the given vector layout and pop up a browser.
+
+    Parameters
+    ----------
+    layout : DistIdxsLayout
+        The layout of the input and output vectors.
+    title : str
+        Title displayed on the page.
+    port : int
+        Web server port.
+    """
+    app = Application(layout, title)
+    app.listen(port)
+
+    print("starting server on port %d" % port)
+
+    serve_thread = startThread(tornado.ioloop.IOLoop.current().start)
+    launch_thread = startThread(lambda: launch_browser(port))
+
+    while serve_thread.is_alive():
+        serve_thread.join(timeout=1)
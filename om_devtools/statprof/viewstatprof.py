@@ -29,7 +29,7 @@ from openmdao.core.problem import Problem
 from openmdao.core.driver import Driver
 from openmdao.solvers.solver import Solver
 
-from om_devtools.functionlocator import FunctionLocator
+from om_devtools.functionlocator import FunctionLocator, default_cache_file
 
 
 def launch_browser(port):
@@ -90,14 +90,14 @@ def _get_color(val, maxval):
 
 
 class Application(tornado.web.Application):
-    def __init__(self, pyfile, raw_stat_file, statprof_data, nsamples):
+    def __init__(self, pyfile, raw_stat_file, statprof_data, nsamples, cache_file=None):
         if pyfile is None:
             self.infile = raw_stat_file
         else:
             self.infile = pyfile
         self.raw_stat_file = raw_stat_file
         self.data = statprof_data
-        self.funct_locator = FunctionLocator()
+        self.funct_locator = FunctionLocator(cache_file=cache_file)
         self.nsamples = nsamples
 
         handlers = [
@@ -126,9 +126,11 @@ class HeatMap(tornado.web.RequestHandler):
         app = self.application
         srcfile, fstart = ident.split('&')
         fstart = int(fstart)
-        app.funct_locator.process_file(srcfile)
-        fpath, fstop = app.funct_locator.get_funct_last_line(fstart)
-        if fstop is None:  # it's not a function, so just show a region around the line
+        fpath, start, fstop = app.funct_locator.find(srcfile, fstart)
+        app.funct_locator.save_cache()
+        if fstop is not None:
+            fstart = start
+        else:  # it's not in a function, so just show a region around the line
             fstop = fstart + 25
             fstart -= 25
             if fstart < 0:
@@ -165,7 +167,7 @@ class HeatMap(tornado.web.RequestHandler):
 #         self.render('icicle.html', call_tree=app.data['call_tree'])
 
 
-def view_statprof(options, pyfile, raw_stat_file):
+def view_statprof(options, pyfile, raw_stat_file, cache_file=None):
     """
     Generate a self-contained html file containing a detailed statistical profile viewer.
 
@@ -179,6 +181,8 @@ def view_statprof(options, pyfile, raw_stat_file):
         Python script being profiled.
     raw_stat_file : str
         The name of the raw statistical profiling data file.
+    cache_file : str or None
+        If given, the FunctionLocator cache file used to avoid reparsing source files.
     """
     if MPI and MPI.COMM_WORLD.rank != 0:
         return
@@ -261,7 +265,9 @@ def view_statprof(options, pyfile, raw_stat_file):
 
     port = options.port
 
-    app = Application(pyfile, raw_stat_file, data, samples_taken)
+    app = Application(pyfile, raw_stat_file, data, samples_taken, cache_file=cache_file)
+    # find functions in all of the profiled files up front rather than on each click
+    app.funct_locator.process_files(heatmap_dict)
     app.listen(port)
 
     print("starting server on port %d" % port)
@@ -443,9 +449,9 @@ def _statprof_exec(options, user_args):
         pyfile = None
 
     if options.noshow:
-        _process_raw_statfile(outfile, options)
+        _process_raw_statfile(outfile, options, cache_file=default_cache_file())
     else:
-        view_statprof(options, pyfile, outfile)
+        view_statprof(options, pyfile, outfile, cache_file=default_cache_file())
 
 
 def _statprof_setup():
@@ -478,9 +484,10 @@ def _rawfile_iter(fname, maps):
             yield fnames[fname], lnum, functs[func], funcstart, objs[obj], frame_id
 
 
-def _process_raw_statfile(fname, options):
-    if options.groupby not in ('instance', 'line', 'instfunction'):
-        raise RuntimeError("Illegal option for --groupby.  Must be 'instance', 'line', or 'function'.")
+def _process_raw_statfile(fname, options, cache_file=None):
+    if options.groupby not in ('instance', 'line', 'function', 'instfunction'):
+        raise RuntimeError("Illegal option for --groupby.  Must be 'instance', 'line', "
+                           "'function' or 'instfunction'.")
 
     total_hits = 0
     outstream = open(_get_statfile_name(options), 'w')
@@ -499,6 +506,17 @@ def _process_raw_statfile(fname, options):
         for fname, line_number, func, fstart, obj, frame_id in _rawfile_iter(fname, maps):
             dct[line_number, func, fstart, obj] += 1
         display_instance_data(dct, samples_taken, outstream)
+    elif options.groupby == 'function':
+        locator = FunctionLocator(cache_file=cache_file)
+        locator.process_files(maps['fnames'].values())
+        # look up each distinct line once rather than once per sample
+        line_hits = defaultdict(int)
+        for fname, line_number, func, fstart, obj, frame_id in _rawfile_iter(fname, maps):
+            line_hits[fname, line_number] += 1
+        failed = set()
+        for (fname, line_number), hits in line_hits.items():
+            dct[_get_funct_key(locator, fname, line_number, failed)] += hits
+        display_function_data(dct, samples_taken, outstream)
     elif options.groupby == 'instfunction':
         for fname, line_number, func, fstart, obj, frame_id in _rawfile_iter(fname, maps):
             if func == '<module>':
@@ -520,6 +538,28 @@ def display_instance_data(dct, total_hits, stream=sys.stdout):
         print("{}  {} hits  {:<5.2f}%".format(key, hits, hits/total_hits*100),
               file=stream)
 
+def _get_funct_key(locator, fname, line_number, failed=None):
+    """
+    Return (fname, dotted name) of the innermost function or class containing the given line.
+
+    If the file can't be found, read or parsed, the name is '?'.  Such files are added to
+    failed, if given, so they aren't tried again.
+    """
+    if fname.startswith('<') or (failed is not None and fname in failed):
+        return (fname, '?')
+    try:
+        fpath, _, _ = locator.find(fname, line_number)
+    except (SyntaxError, ValueError, OSError, UnicodeDecodeError):
+        if failed is not None:
+            failed.add(fname)
+        return (fname, '?')
+    return (fname, '<module>' if fpath is None else fpath)
+
+def display_function_data(dct, total_hits, stream=sys.stdout):
+    for key, hits in sorted(dct.items(), key=lambda x: x[1]):
+        print("{}  {} hits  {:<5.2f}%".format(key, hits, hits/total_hits*100),
+              file=stream)
+
 def display_instance_func_data(dct, total_hits, stream=sys.stdout):
     for key, hits in sorted(dct.items(), key=lambda x: x[1]):
         print("{}  {} hits  {:<5.2f}%".format(key, hits, hits/total_hits*100),
@@ -0,0 +1,233 @@
+"""
+Setup functions for the 'openmdao systimes' command plugin.
+
+This command times calls to key System and Solver methods for each instance in the model.
+"""
+
+import sys
+import json
+import weakref
+from time import perf_counter_ns
+from functools import wraps
+
+from openmdao.utils.hooks import _register_hook
+from openmdao.utils.file_utils import _load_and_exec
+from openmdao.utils.mpi import MPI
+
+
+_system_methods = ('_solve_nonlinear', '_apply_nonlinear', '_linearize', '_solve_linear',
+                   'compute', 'compute_partials')
+_solver_methods = ('solve',)
+
+
+class SystemTimer(object):
+    """
+    Accumulate call counts and inclusive/exclusive times of System and Solver methods.
+
+    Methods are wrapped on each instance, so the overhead is a few clock reads per call of a
+    wrapped method rather than per call of every python function as with cProfile.
+
+    Attributes
+    ----------
+    slots : list
+        Entries of the form (pathname, label, method_name) for each wrapped method.
+    ncalls : list of int
+        Number of calls of each wrapped method.
+    inclusive : list of int
+        Total time in ns spent in each wrapped method.
+    exclusive : list of int
+        Time in ns spent in each wrapped method excluding time in other wrapped methods.
+    _stack : list
+        Time in ns spent in wrapped methods called from each active wrapped method.
+    _wrapped : weakref.WeakSet
+        Systems and Solvers whose methods have been wrapped.
+    """
+
+    def __init__(self):
+        self.slots = []
+        self.ncalls = []
+        self.inclusive = []
+        self.exclusive = []
+        self._stack = []
+        self._wrapped = weakref.WeakSet()
+
+    def _wrap(self, inst, meth_name, pathname, label):
+        slot = len(self.slots)
+        self.slots.append((pathname, label, meth_name))
+        self.ncalls.append(0)
+        self.inclusive.append(0)
+        self.exclusive.append(0)
+
+        ncalls = self.ncalls
+        inclusive = self.inclusive
+        exclusive = self.exclusive
+        stack = self._stack
+        meth = getattr(inst, meth_name)
+
+        @wraps(meth)
+        def _timed(*args, **kwargs):
+            child = [0]
+            stack.append(child)
+            start = perf_counter_ns()
+            try:
+                return meth(*args, **kwargs)
+            finally:
+                elapsed = perf_counter_ns() - start
+                stack.pop()
+                ncalls[slot] += 1
+                inclusive[slot] += elapsed
+                exclusive[slot] += elapsed - child[0]
+                if stack:
+                    stack[-1][0] += elapsed
+
+        setattr(inst, meth_name, _timed)
+
+    def _wrap_all(self, inst, meth_names, pathname, label):
+        if inst in self._wrapped:
+            return
+        self._wrapped.add(inst)
+        for meth_name in meth_names:
+            if hasattr(inst, meth_name):
+                self._wrap(inst, meth_name, pathname, label)
+
+    def instrument(self, model):
+        """
+        Wrap the timed methods of every System and Solver in the given model.
+
+        Instances that were already wrapped are skipped.
+
+        Parameters
+        ----------
+        model : <System>
+            The top level System.
+        """
+        for s in model.system_iter(include_self=True, recurse=True):
+            label = '%s (%s)' % (s.pathname if s.pathname else '<model>', type(s).__name__)
+            self._wrap_all(s, _system_methods, s.pathname, label)
+            for solver in (s.nonlinear_solver, s.linear_solver):
+                if solver is not None:
+                    self._wrap_all(solver, _solver_methods, s.pathname,
+                                   '%s %s' % (label, type(solver).__name__))
+
+    def get_data(self):
+        """
+        Return timing data for each wrapped method that was called.
+
+        Returns
+        -------
+        list of dict
+            Timing data in model tree order.
+        """
+        data = []
+        for slot, (pathname, label, meth_name) in enumerate(self.slots):
+            if self.ncalls[slot] > 0:
+                data.append({
+                    'pathname': pathname,
+                    'label': label,
+                    'method': meth_name,
+                    'ncalls': self.ncalls[slot],
+                    'inclusive': self.inclusive[slot] * 1e-9,
+                    'exclusive': self.exclusive[slot] * 1e-9,
+                })
+        return data
+
+    def display(self, stream=sys.stdout):
+        """
+        Display the timing data as a tree following the model hierarchy.
+
+        Parameters
+        ----------
+        stream : file-like
+            Where the output will go.
+        """
+        template = "{0:>10} {1:>14} {2:>14} {3:>14}  {4}"
+        print(template.format('ncalls', 'inclusive (s)', 'exclusive (s)', 'per call (ms)',
+                              'method'), file=stream)
+        last_label = None
+        for d in self.get_data():
+            indent = '  ' * (d['pathname'].count('.') + 1 if d['pathname'] else 0)
+            if d['label'] != last_label:
+                print('%s%s' % (indent, d['label']), file=stream)
+                last_label = d['label']
+            print(template.format(d['ncalls'], '%.6f' % d['inclusive'], '%.6f' % d['exclusive'],
+                                  '%.6f' % (d['inclusive'] / d['ncalls'] * 1000.),
+                                  indent + '  ' + d['method']), file=stream)
+
+
+def _systimes_setup_parser(parser):
+    """
+    Set up the openmdao subparser for the 'openmdao systimes' command.
+
+    Parameters
+    ----------
+    parser : argparse subparser
+        The parser we're adding options to.
+    """
+    parser.add_argument('file', nargs=1, help='Python script or test to time.')
+    parser.add_argument('-o', default=None, action='store', dest='outfile',
+                        help='Name of output file.  By default, output goes to stdout.')
+    parser.add_argument('--json', default='systimes.json', action='store', dest='json',
+                        help='Name of the JSON output file. Defaults to systimes.json. Under MPI, '
+                        'the rank is appended to the name.')
+
+
+def _systimes_exec(options, user_args):
+    """
+    Register the hook function for 'openmdao systimes', run the script and report.
+
+    Parameters
+    ----------
+    options : argparse Namespace
+        Command line options.
+    user_args : list of str
+        Args to be passed to the user script.
+    """
+    rank = MPI.COMM_WORLD.rank if MPI else 0
+
+    # one timer per Problem, in the order they finished setup
+    timers = {}
+    # number of setups of each Problem and the setup count when it was last instrumented, so
+    # the model is walked once per setup rather than on every final_setup
+    nsetups = {}
+    instrumented = {}
+
+    def _count_setup(prob):
+        nsetups[id(prob)] = nsetups.get(id(prob), 0) + 1
+
+    def _instrument(prob):
+        if instrumented.get(id(prob)) == nsetups.get(id(prob)):
+            return
+        instrumented[id(prob)] = nsetups.get(id(prob))
+        if id(prob) not in timers:
+            timers[id(prob)] = (prob, SystemTimer())
+        timers[id(prob)][1].instrument(prob.model)
+
+    _register_hook('setup', 'Problem', post=_count_setup)
+    _register_hook('final_setup', 'Problem', post=_instrument)
+
+    _load_and_exec(options.file[0], user_args)
+
+    jsonfile = options.json if MPI is None else '%s.%d' % (options.json, rank)
+    with open(jsonfile, 'w') as f:
+        json.dump([{'problem': getattr(prob, '_name', str(i)), 'data': timer.get_data()}
+                   for i, (prob, timer) in enumerate(timers.values())], f, indent=1)
+
+    if rank == 0:
+        out = sys.stdout if options.outfile is None else open(options.outfile, 'w')
+        for i, (prob, timer) in enumerate(timers.values()):
+            title = "System Method Times for Problem %s" % getattr(prob, '_name', str(i))
+            print(title, file=out)
+            print('-' * len(title), file=out)
+            timer.display(stream=out)
+            print('\n', file=out)
+
+
+def _systimes_setup():
+    """
+    A command to time key System and Solver methods.
+    """
+    return (
+        _systimes_setup_parser,
+        _systimes_exec,
+        "Time key System and Solver methods for each instance in the model."
+        )
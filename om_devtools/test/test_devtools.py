@@ -1,6 +1,7 @@
 
 import unittest
 import io
+import os
 
 import numpy as np
 
@@ -40,6 +41,939 @@ class DumpIdxsTestCase(unittest.TestCase):
             if line:
                 self.assertEqual(expected[i], line)
 
+    def test_dump_idxs_full(self):
+        p = om.Problem()
+        model = p.model
+        model.add_subsystem('indeps', om.IndepVarComp('x', val=np.ones(5)))
+        model.add_subsystem('C0', om.ExecComp('y=2.*x', x=np.ones(5), y=np.ones(5)))
+        model.add_subsystem('C1', om.ExecComp('y=2.*x', x=np.ones(3), y=np.ones(3)))
+        model.connect('indeps.x', 'C0.x')
+        model.connect('C0.y', 'C1.x', src_indices=[0, 1, 2])
+
+        p.setup()
+        p.final_setup()
+
+        from om_devtools.dist_idxs import dump_dist_idxs
+
+        f = io.StringIO()
+        dump_dist_idxs(p, full=True, stream=f)
+        lines = [line.split() for line in f.getvalue().splitlines() if line.strip()]
+        outs = {line[0]: line[1] for line in lines}
+        ins = {line[3]: line[2] for line in lines if len(line) == 4}
+
+        # variable order in the vectors depends on the OpenMDAO version, so check sizes
+        def _size(rng):
+            start, end = rng.split('-')
+            return int(end) - int(start) + 1
+
+        self.assertEqual(_size(outs['indeps.x']), 5)
+        self.assertEqual(_size(outs['C0.y']), 5)
+        self.assertEqual(_size(outs['C1.y']), 3)
+        self.assertEqual(_size(ins['C0.x']), 5)
+        self.assertEqual(_size(ins['C1.x']), 3)
+
+    def test_layout_lookup(self):
+        p = om.Problem()
+        model = p.model
+        model.add_subsystem('indeps', om.IndepVarComp('x', val=np.ones(5)))
+        model.add_subsystem('C0', om.ExecComp('y=2.*x', x=np.ones(5), y=np.ones(5)))
+        model.add_subsystem('C1', om.ExecComp('y=2.*x', x=np.ones(3), y=np.ones(3)))
+        model.connect('indeps.x', 'C0.x')
+        model.connect('C0.y', 'C1.x', src_indices=[0, 1, 2])
+
+        p.setup()
+        p.final_setup()
+
+        import tempfile
+        from om_devtools.dist_idxs import DistIdxsLayout
+
+        layout = DistIdxsLayout.from_problem(p)
+
+        for vec, total in (('output', 13), ('input', 8)):
+            for i in range(total):
+                name, rank, local = layout.find(vec, i)
+                self.assertEqual(rank, 0)
+                self.assertEqual(layout.global_index(vec, name, rank, local), i)
+            with self.assertRaises(IndexError):
+                layout.find(vec, total)
+
+        self.assertEqual(layout.find('output', layout.global_index('output', 'C1.y', 0, 2)),
+                         ('C1.y', 0, 2))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for fname in ('layout.json', 'layout.npz'):
+                path = os.path.join(tmpdir, fname)
+                layout.save(path)
+                loaded = DistIdxsLayout.load(path)
+                self.assertEqual(loaded.names, layout.names)
+                self.assertEqual(loaded.find('input', 6), layout.find('input', 6))
+
+    def test_transfer_data(self):
+        p = om.Problem()
+        model = p.model
+        model.add_subsystem('indeps', om.IndepVarComp('x', val=np.ones(5)))
+        model.add_subsystem('C0', om.ExecComp('y=2.*x', x=np.ones(5), y=np.ones(5)))
+        model.add_subsystem('C1', om.ExecComp('y=2.*x', x=np.ones(3), y=np.ones(3)))
+        model.connect('indeps.x', 'C0.x')
+        model.connect('C0.y', 'C1.x', src_indices=[0, 1, 2])
+
+        p.setup()
+        p.final_setup()
+
+        from om_devtools.dist_idxs import get_transfer_data, dump_transfer_report
+
+        matrix, conn_bytes = get_transfer_data(p)
+
+        # everything is local on a single rank
+        itemsize = model._outputs._data.real.itemsize
+        self.assertEqual(matrix.shape, (1, 1))
+        self.assertEqual(matrix[0, 0], (5 + 3) * itemsize)
+        self.assertEqual(conn_bytes, {})
+
+        f = io.StringIO()
+        dump_transfer_report(p, stream=f)
+        self.assertIn("Total inter-rank bytes: 0", f.getvalue())
+
+    def test_balance_data(self):
+        p = om.Problem()
+        model = p.model
+        par = model.add_subsystem('par', om.ParallelGroup())
+        par.add_subsystem('C0', om.ExecComp('y=2.*x', x=np.ones(3), y=np.ones(3)))
+        par.add_subsystem('C1', om.ExecComp('y=2.*x', x=np.ones(7), y=np.ones(2)))
+
+        p.setup()
+        p.final_setup()
+
+        from om_devtools.dist_idxs import get_balance_data, dump_balance_report
+
+        data = get_balance_data(model, limit=1)
+        self.assertEqual(data['input']['totals'].tolist(), [10])
+        self.assertEqual(data['output']['imbalance'], 1.)
+        self.assertEqual(data['input']['largest'], [('par.C1.x', 7)])
+
+        f = io.StringIO()
+        dump_balance_report(p, par_groups=True, stream=f)
+        self.assertIn("Load Balance for 'par' <class ParallelGroup>", f.getvalue())
+
+    def test_view_blocks(self):
+        from om_devtools.statprof.viewdistidxs import _VecBlocks
+
+        # 2 ranks, 3 variables, where 'b' is only on rank 1
+        sizes = np.array([[4, 0, 2], [3, 5, 1]])
+        offsets = np.array([[0, 4, 4], [6, 9, 14]])
+        vec = _VecBlocks(['c', 'b', 'a'], sizes, offsets)
+
+        self.assertEqual(vec.rank_totals.tolist(), [6, 9])
+        self.assertEqual([vec.row(i)['start'] for i in vec.get_order('start', 'asc', '')],
+                         [0, 4, 6, 9, 14])
+        self.assertEqual([vec.row(i)['name'] for i in vec.get_order('name', 'asc', '')],
+                         ['a', 'a', 'b', 'c', 'c'])
+        self.assertEqual([vec.row(i)['size'] for i in vec.get_order('size', 'desc', '')],
+                         [5, 4, 3, 2, 1])
+        self.assertEqual(vec.row(vec.get_order('start', 'asc', 'B')[0]),
+                         {'name': 'b', 'rank': 1, 'start': 9, 'end': 13, 'size': 5})
+
+
+class FunctionLocatorTestCase(unittest.TestCase):
+    def test_find(self):
+        import tempfile
+        import textwrap
+        from om_devtools.functionlocator import FunctionLocator
+
+        code = textwrap.dedent("""
+            x = 1
+
+            class A(object):
+                y = 2
+
+                @staticmethod
+                def meth():
+                    def inner():
+                        return 1
+                    return inner()
+
+                class B:
+                    async def am(self):
+                        pass
+
+            w = 4
+        """)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, 'funcs.py')
+            with open(fname, 'w') as f:
+                f.write(code)
+
+            floc = FunctionLocator()
+            expected = {
+                2: None, 4: 'A', 5: 'A', 7: 'A.meth', 8: 'A.meth', 9: 'A.meth.inner',
+                11: 'A.meth', 12: 'A', 13: 'A.B', 14: 'A.B.am', 15: 'A.B.am', 17: None,
+            }
+            for lineno, fpath in expected.items():
+                self.assertEqual(floc.find(fname, lineno)[0], fpath)
+
+            # decorator line is the first line of the function
+            self.assertEqual(floc.find(fname, 7), ('A.meth', 7, 11))
+            self.assertEqual(floc.get_funct_last_line(7, fname), ['A.meth', 11])
+
+    def test_funct_key(self):
+        import tempfile
+        from om_devtools.functionlocator import FunctionLocator
+        from om_devtools.statprof.viewstatprof import _get_funct_key
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, 'undecodable.py')
+            with open(fname, 'wb') as f:
+                f.write(b'\xff\xfe\x00def f():\n')
+            missing = os.path.join(tmpdir, 'missing.py')
+
+            floc = FunctionLocator()
+            failed = set()
+            for line in (1, 2):
+                self.assertEqual(_get_funct_key(floc, fname, line, failed), (fname, '?'))
+                self.assertEqual(_get_funct_key(floc, missing, line, failed), (missing, '?'))
+            self.assertEqual(failed, {fname, missing})
+            self.assertEqual(_get_funct_key(floc, __file__, 1), (__file__, '<module>'))
+
+    def test_cache(self):
+        import tempfile
+        from om_devtools.functionlocator import FunctionLocator
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_file = os.path.join(tmpdir, 'sub', 'floc.cache')
+            fnames = []
+            for i in range(6):
+                fnames.append(os.path.join(tmpdir, 'mod%d.py' % i))
+                with open(fnames[-1], 'w') as f:
+                    f.write("def func%d():\n    pass\n" % i)
+            with open(os.path.join(tmpdir, 'bad.py'), 'w') as f:
+                f.write("def (:\n")
+            fnames.append(os.path.join(tmpdir, 'bad.py'))
+
+            floc = FunctionLocator(cache_file=cache_file)
+            floc.process_files(fnames)
+            self.assertEqual(floc.find(fnames[3], 2), ('func3', 1, 2))
+            self.assertEqual(floc.find(fnames[-1], 1), (None, None, None))
+            self.assertTrue(os.path.isfile(cache_file))
+
+            # a new session gets the ranges from the cache, unless the file has changed
+            with open(fnames[0], 'w') as f:
+                f.write("\n\ndef changed():\n    pass\n")
+            floc = FunctionLocator(cache_file=cache_file)
+            self.assertEqual(floc._get_cached(fnames[1]), [(1, 2, 'func1')])
+            self.assertIsNone(floc._get_cached(fnames[0]))
+            floc.process_files(fnames)
+            self.assertEqual(floc.find(fnames[0], 4), ('changed', 3, 4))
+
+
+class _ArgTypesTarget(object):
+    def meth(self, x):
+        return x
+
+    @staticmethod
+    def smeth(x, y=None):
+        return x
+
+
+class PerformanceTestCase(unittest.TestCase):
+    def tearDown(self):
+        from om_devtools import performance
+        # don't dump counts from these tests at exit
+        performance._arg_type_counts[:] = []
+        performance._array_info_counts[:] = []
+        performance._call_times[:] = []
+
+    def test_arg_type_counts(self):
+        from om_devtools.performance import save_arg_type_counts, _get_typ_count_data
+
+        @save_arg_type_counts
+        def func(a, b=1, *args, c=None, **kwargs):
+            return a
+
+        func(1, 2.)
+        func('x', b='y', c=3)
+        func(1, 2, 3, 4, d=5.)
+        func(a=1.)
+
+        data = _get_typ_count_data()[0]
+        self.assertEqual(data['ncalls'], 4)
+        self.assertEqual(data['nsampled'], 4)
+        self.assertEqual(dict(data['args']['a']), {'int': 2, 'str': 1, 'float': 1})
+        self.assertEqual(dict(data['args']['b']), {'float': 1, 'str': 1, 'int': 1})
+        self.assertEqual(data['args']['c'], [('int', 1)])
+        self.assertEqual(data['args']['args'], [('int', 2)])
+        self.assertEqual(data['args']['kwargs'], [('float', 1)])
+
+    def test_sampled_arg_type_counts(self):
+        from om_devtools.performance import save_arg_type_counts, _get_typ_count_data
+
+        @save_arg_type_counts(sample=10)
+        def func(a):
+            return a
+
+        for i in range(95):
+            self.assertEqual(func(np.zeros(i)).size, i)
+
+        data = _get_typ_count_data()[0]
+        self.assertEqual(data['ncalls'], 95)
+        self.assertEqual(data['nsampled'], 9)
+        self.assertEqual(data['args']['a'], [('numpy.ndarray', 9)])
+
+    def test_array_info(self):
+        from om_devtools.performance import save_array_info, _get_array_info_data
+
+        @save_array_info
+        def func(a, b=None):
+            return a
+
+        x = np.zeros((4, 5))
+        for i in range(8):
+            func(x, b=2)
+        func(x[:, 1:3])
+        func(x.T.astype(np.float32))
+
+        data = _get_array_info_data()[0]
+        self.assertEqual(data['ncalls'], 10)
+        self.assertNotIn('b', data['args'])
+        infos = data['args']['a']
+        self.assertEqual(infos[0], {'dtype': np.dtype(float).str, 'ndim': 2, 'max_size': 32,
+                                    'layout': 'C', 'view': False, 'count': 8})
+        self.assertEqual(sorted((i['layout'], i['view']) for i in infos[1:]),
+                         [('F', False), ('noncontig', True)])
+        self.assertEqual(len(data['flags']['a']), 2)
+
+    def test_time_calls(self):
+        from om_devtools.performance import time_calls, _merge_call_times, \
+            _get_call_time_data, _call_times, _bucket_upper
+
+        @time_calls(by_caller=True)
+        def func(n):
+            return sum(range(n))
+
+        for i in range(100):
+            func(10)
+        func(100000)
+
+        data = _get_call_time_data(_merge_call_times(_call_times))[0]
+        self.assertEqual(data['ncalls'], 101)
+        self.assertEqual(sum(data['hist'].values()), 101)
+        self.assertTrue(data['p50'] <= data['p90'] <= data['p99'] <= data['max'])
+        # the single slow call is the max, but not the p90
+        self.assertTrue(data['p90'] < data['max'])
+        self.assertEqual(len(data['callers']), 2)
+        self.assertEqual(data['callers'][0]['ncalls'], 100)
+
+        # bucket bounds increase monotonically and are within 25% of each other
+        uppers = [_bucket_upper(i) for i in list(range(8)) + list(range(16, 260))]
+        self.assertEqual(uppers, sorted(uppers))
+        self.assertTrue(all(b <= 1.25 * (a + 1) for a, b in zip(uppers[8:], uppers[9:])))
+
+    def test_wrap_arg_type_counts(self):
+        from om_devtools.performance import wrap_arg_type_counts, _get_typ_count_data
+
+        count = wrap_arg_type_counts(__name__ + '._ArgTypesTarget')
+        self.assertEqual(count, 2)
+
+        obj = _ArgTypesTarget()
+        for i in range(3):
+            obj.meth(i)
+        obj.meth('a')
+        _ArgTypesTarget.smeth(1., y=[])
+
+        data = {d['function'].rsplit('.', 1)[-1]: d for d in _get_typ_count_data()}
+        self.assertEqual(data['meth']['ncalls'], 4)
+        self.assertEqual(data['meth']['args']['x'], [('int', 3), ('str', 1)])
+        self.assertEqual(data['smeth']['args']['y'], [('list', 1)])
+
+
+class MemReportTestCase(unittest.TestCase):
+    def test_mem_report(self):
+        p = om.Problem()
+        model = p.model
+        model.add_subsystem('indeps', om.IndepVarComp('x', val=np.ones(5)))
+        sub = model.add_subsystem('sub', om.Group())
+        sub.add_subsystem('C1', om.ExecComp('y=2.*x', x=np.ones(5), y=np.ones(5)))
+        sub.add_subsystem('C2', om.ExecComp('y=2.*x', x=np.ones(10), y=np.ones(10),
+                                            has_diag_partials=True))
+        model.connect('indeps.x', 'sub.C1.x')
+        model.connect('sub.C1.y', 'sub.C2.x', src_indices=np.arange(10) % 5)
+
+        p.setup()
+        p.final_setup()
+
+        from om_devtools.memreport import get_system_mem, dump_mem_report
+
+        data = get_system_mem(p)
+
+        # input, output and residual, nonlinear and linear
+        itemsize = sum(vec._data.itemsize for vec in model._vectors['output'].values())
+        self.assertEqual(data['sub.C1']['vectors'], (5 + 5 + 5) * itemsize)
+        self.assertEqual(data['sub.C2']['vectors'], (10 + 10 + 10) * itemsize)
+        self.assertTrue(data['sub.C1']['dense_subjacs'] > 0)
+        self.assertTrue(data['sub.C2']['sparse_subjacs'] > 0)
+        self.assertTrue(data['sub.C1']['jacobian'] >= 5 * 5 * 8)
+        self.assertEqual(data['sub']['inclusive']['vectors'],
+                         data['sub.C1']['vectors'] + data['sub.C2']['vectors'])
+        self.assertEqual(data['']['inclusive']['total'],
+                         sum(e['total'] for e in data.values()))
+
+        f = io.StringIO()
+        dump_mem_report(p, stream=f)
+        self.assertIn("'sub.C2' <class ExecComp>", f.getvalue())
+
+    def test_solver_jac_mem(self):
+        p = om.Problem()
+        model = p.model
+        model.add_subsystem('indeps', om.IndepVarComp('x', val=np.ones(5)))
+        model.add_subsystem('C1', om.ExecComp('y=2.*x', x=np.ones(5), y=np.ones(5)))
+        model.connect('indeps.x', 'C1.x')
+        model.linear_solver = om.DirectSolver()
+        model.add_design_var('indeps.x')
+        model.add_objective('C1.y', index=0)
+
+        p.setup()
+        p.run_model()
+        p.compute_totals()
+
+        from om_devtools.memreport import _obj_nbytes, _array_nbytes
+
+        # the assembled matrices of the solver's jacobian are counted along with its LU
+        solver = model.linear_solver
+        jac = solver._assembled_jac
+        self.assertIsNotNone(jac)
+        jac_bytes = _obj_nbytes(jac, {id(jac._subjacs_info)})
+        self.assertTrue(jac_bytes > 0)
+        self.assertEqual(_obj_nbytes(solver, set()), jac_bytes + _array_nbytes(solver._lu))
+
+
+class SysTimesTestCase(unittest.TestCase):
+    def test_system_timer(self):
+        p = om.Problem()
+        model = p.model
+        model.add_subsystem('indeps', om.IndepVarComp('x', val=np.ones(5)))
+        sub = model.add_subsystem('sub', om.Group())
+        sub.add_subsystem('C1', om.ExecComp('y=2.*x', x=np.ones(5), y=np.ones(5)))
+        model.add_subsystem('C2', om.ExecComp('z=3.*w'))  # w is connected to _auto_ivc
+        model.connect('indeps.x', 'sub.C1.x')
+
+        p.setup()
+        p.final_setup()
+
+        from om_devtools.systimes import SystemTimer
+
+        timer = SystemTimer()
+        timer.instrument(model)
+        timer.instrument(model)  # methods must not be wrapped twice
+        p.run_model()
+        p.run_model()
+
+        data = {(d['pathname'], d['method']): d for d in timer.get_data()}
+        self.assertEqual(data['sub.C1', 'compute']['ncalls'], 2)
+        self.assertEqual(data['sub', '_solve_nonlinear']['ncalls'], 2)
+
+        # a Group's exclusive time doesn't include the time of its subsystems
+        grp = data['sub', '_solve_nonlinear']
+        comp = data['sub.C1', '_solve_nonlinear']
+        self.assertTrue(grp['inclusive'] >= comp['inclusive'])
+        self.assertTrue(grp['exclusive'] <= grp['inclusive'] - comp['inclusive'] + 1e-9)
+
+        f = io.StringIO()
+        timer.display(stream=f)
+        self.assertIn('    sub.C1 (ExecComp)', f.getvalue())
+
+        # _auto_ivc is replaced by setup, so the new one is wrapped and existing systems
+        # aren't rewrapped
+        p.setup()
+        p.final_setup()
+        timer.instrument(model)
+        p.run_model()
+        data = timer.get_data()
+        self.assertEqual(len([d for d in data if d['pathname'] == '_auto_ivc']), 2)
+        self.assertEqual([d['ncalls'] for d in data
+                          if d['pathname'] == 'sub.C1' and d['method'] == 'compute'], [3])
+
+
+class MemtopTestCase(unittest.TestCase):
+    def setUp(self):
+        from openmdao.utils import hooks
+        hooks._reset_all_hooks()
+        hooks.use_hooks = True
+
+    def tearDown(self):
+        import tracemalloc
+        from openmdao.utils import hooks
+        tracemalloc.stop()
+        hooks._reset_all_hooks()
+
+    def test_phases(self):
+        import tracemalloc
+        from om_devtools.memtop import _PhaseTracker
+
+        tracker = _PhaseTracker(limit=5)
+        tracker.register_hooks()
+        tracemalloc.start()
+
+        p = om.Problem()
+        p.model.add_subsystem('C1', om.ExecComp('y=2.*x', x=np.ones(1000), y=np.ones(1000),
+                                                has_diag_partials=True))
+        p.setup()
+        p.run_model()
+        p.run_model()
+
+        labels = [phase[0] for phase in tracker.phases]
+        self.assertEqual(labels, ['setup', 'final_setup', 'run_model', 'final_setup #2',
+                                  'run_model #2'])
+        for label, current, peak, report in tracker.phases:
+            self.assertTrue(peak >= current)
+            self.assertIn("Changes at End of %s" % label, report)
+
+    def test_leak_tracker(self):
+        import tracemalloc
+        from om_devtools.memtop import _LeakTracker
+
+        tracker = _LeakTracker()
+        tracemalloc.start()
+
+        leaked = []
+        tracker.update(tracemalloc.take_snapshot())
+        for i in range(5):
+            leaked.append(bytearray(10000))
+            tracker.update(tracemalloc.take_snapshot())
+
+        fname, lineno, rate, total, nincr = tracker.growing()[0]
+        self.assertEqual(fname, __file__)
+        self.assertEqual(nincr, 5)
+        self.assertTrue(rate >= 10000)
+        self.assertTrue(total >= 50000)
+
+    def test_leak_tracker_shrink(self):
+        import tracemalloc
+        from om_devtools.memtop import _LeakTracker
+
+        def _snapshot(sizes):
+            return tracemalloc.Snapshot([(0, size, ((fname, 1),), 1)
+                                         for fname, size in sizes.items()], 1)
+
+        # a.py shrinks then grows again, b.py first allocates after the first snapshot
+        tracker = _LeakTracker()
+        for a, b in ((1000, 0), (900, 100), (950, 200), (960, 300), (970, 400)):
+            sizes = {'a.py': a}
+            if b:
+                sizes['b.py'] = b
+            tracker.update(_snapshot(sizes))
+
+        self.assertEqual(tracker.growing(), [('b.py', 1, 100., 400, 4)])
+
+        # one-time growth isn't reported as steady growth
+        tracker = _LeakTracker()
+        for size in (1000, 2000, 2000, 2000, 2000):
+            tracker.update(_snapshot({'a.py': size}))
+        self.assertEqual(tracker.growing(), [])
+        self.assertEqual(tracker.growing(steady=False), [('a.py', 1, 250., 1000, 1)])
+        f = io.StringIO()
+        tracker.display(file=f)
+        self.assertIn("Grew Only in Some Iterations", f.getvalue())
+
+        # lines whose allocations are all freed are dropped too
+        tracker = _LeakTracker()
+        for sizes in ({'a.py': 1000}, {}, {'a.py': 2000}):
+            tracker.update(_snapshot(sizes))
+        self.assertEqual(tracker.growing(), [])
+
+    def test_system_mem(self):
+        import tracemalloc
+        from om_devtools.memtop import _SystemMemTracker
+
+        tracker = _SystemMemTracker()
+        tracemalloc.start()
+        tracker.start()
+        try:
+            p = om.Problem()
+            sub = p.model.add_subsystem('sub', om.Group())
+            sub.add_subsystem('C1', om.ExecComp('y=2.*x', x=np.ones(100000),
+                                                y=np.ones(100000), has_diag_partials=True))
+            p.setup()
+            p.run_model()
+        finally:
+            tracker.stop()
+
+        mem = tracker.get_system_mem()
+        self.assertIn('sub.C1', mem)
+        self.assertEqual(mem['sub.C1'][2], "'sub.C1' <class ExecComp>")
+        # C1's inputs and outputs are at least 1.6 MB
+        self.assertTrue(mem['sub.C1'][0] > 1600000)
+        self.assertEqual(mem['sub'][0], mem['sub'][1] + mem['sub.C1'][0])
+        self.assertEqual(mem[''][0], sum(m[1] for m in mem.values()))
+
+    def test_rank_data(self):
+        from om_devtools.memtop import _display_rank_data
+
+        rank_data = [
+            ({('a.py', 1): 1024, ('a.py', 2): 2048}, 4096),
+            ({('a.py', 1): 3072}, 4096),
+            ({('a.py', 1): 2048, ('b.py', 5): 40960}, 81920),
+        ]
+        f = io.StringIO()
+        _display_rank_data(rank_data, limit=2, file=f)
+        lines = f.getvalue().splitlines()
+
+        self.assertEqual(lines[2], "#1: b.py:5: min 0.0 KiB, mean 13.3 KiB, max 40.0 KiB (rank 2)")
+        self.assertEqual(lines[3], "#2: a.py:1: min 1.0 KiB, mean 2.0 KiB, max 3.0 KiB (rank 1)")
+        self.assertTrue(lines[-3].strip().startswith('2'))
+        self.assertIn('<--', lines[-3])
+        self.assertNotIn('<--', lines[-4])
+
+    def test_streaming_sampler(self):
+        import json
+        import time
+        import tracemalloc
+        from om_devtools.memtop import _StreamingSampler
+
+        stream = io.StringIO()
+        sampler = _StreamingSampler(stream, interval=0.05, limit=3,
+                                    filters=[tracemalloc.Filter(True, __file__)])
+        tracemalloc.start()
+        sampler.start()
+        keep = []
+        for i in range(4):
+            keep.append(bytearray(100000))
+            time.sleep(0.06)
+        sampler.stop()
+
+        windows = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(len(windows), sampler.nwindows)
+        self.assertTrue(len(windows) > 1)
+        self.assertEqual([w['window'] for w in windows], list(range(len(windows))))
+        # traces are cleared after each window, so no window sees all of the allocations
+        for w in windows:
+            self.assertTrue(w['total'] < 400000)
+            for size, count, frames in w['top']:
+                self.assertEqual(frames[0][0], __file__)
+        self.assertTrue(sum(w['total'] for w in windows) >= 400000)
+
+
+def _busy(n):
+    total = 0
+    for i in range(n):
+        total += i
+    return total
+
+
+def _busy_outer(n):
+    return _busy(n)
+
+
+class CProfTestCase(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+        self.tempdir = tempfile.mkdtemp()
+        # keep any FunctionLocator cache out of the home directory
+        self.old_cache = os.environ.get('OM_DEVTOOLS_FUNCLOC_CACHE')
+        os.environ['OM_DEVTOOLS_FUNCLOC_CACHE'] = os.path.join(self.tempdir, 'floc.cache')
+
+    def tearDown(self):
+        import shutil
+        if self.old_cache is None:
+            del os.environ['OM_DEVTOOLS_FUNCLOC_CACHE']
+        else:
+            os.environ['OM_DEVTOOLS_FUNCLOC_CACHE'] = self.old_cache
+        shutil.rmtree(self.tempdir)
+
+    def _make_profiles(self, counts):
+        import cProfile
+        fnames = []
+        for rank, n in enumerate(counts):
+            prof = cProfile.Profile()
+            prof.enable()
+            _busy_outer(n)
+            prof.disable()
+            fnames.append(os.path.join(self.tempdir, 'prof.out.%d' % rank))
+            prof.dump_stats(fnames[-1])
+        return fnames
+
+    def test_rank_stats(self):
+        import pstats
+        from om_devtools.cprof import merge_stats, display_rank_stats
+
+        fnames = self._make_profiles([1000, 200000])
+
+        outfile = os.path.join(self.tempdir, 'prof.out')
+        stats = merge_stats(fnames, outfile)
+        busy = [k for k in stats.stats if k[2] == '_busy'][0]
+        self.assertEqual(stats.stats[busy][1], 2)
+        self.assertEqual(pstats.Stats(outfile).stats[busy][1], 2)
+
+        f = io.StringIO()
+        display_rank_stats(fnames, stream=f)
+        lines = [l for l in f.getvalue().splitlines() if l.endswith('(_busy)')]
+        self.assertEqual(len(lines), 1)
+        mn, mean, mx, rank, ncalls = lines[0].split()[:5]
+        self.assertEqual(rank, '1')
+        self.assertEqual(ncalls, '2')
+        self.assertTrue(float(mn) <= float(mean) <= float(mx))
+
+    def test_class_method_stats(self):
+        import cProfile
+        import pstats
+        from om_devtools.cprof import get_class_method_stats
+
+        class Doubler(om.ExplicitComponent):
+            def setup(self):
+                self.add_input('x', np.ones(3))
+                self.add_output('y', np.ones(3))
+
+            def compute(self, inputs, outputs):
+                outputs['y'] = 2. * inputs['x']
+
+        p = om.Problem()
+        p.model.add_subsystem('C1', Doubler())
+        p.model.add_subsystem('C2', Doubler())
+        p.setup()
+
+        prof = cProfile.Profile()
+        prof.enable()
+        p.run_model()
+        p.run_model()
+        prof.disable()
+
+        table = get_class_method_stats(pstats.Stats(prof))
+        # library calls don't persist a FunctionLocator cache by default
+        self.assertFalse(os.path.exists(os.environ['OM_DEVTOOLS_FUNCLOC_CACHE']))
+        rows = [row for row in table if row[0].endswith('Doubler')]
+        self.assertEqual(len(rows), 1)
+        cname, meth, ncalls, tottime, cumtime = rows[0]
+        self.assertEqual(meth, 'compute')
+        self.assertEqual(ncalls, 4)
+        self.assertTrue(cumtime >= tottime)
+
+    def test_class_method_stats_same_name(self):
+        import sys
+        import cProfile
+        import pstats
+        import importlib
+        from om_devtools.cprof import get_class_method_stats
+
+        src = ("import openmdao.api as om\n\n"
+               "class Comp(om.ExplicitComponent):\n"
+               "    def setup(self):\n"
+               "        self.add_input('x')\n"
+               "        self.add_output('y')\n\n"
+               "    def compute(self, inputs, outputs):\n"
+               "        outputs['y'] = {0} * inputs['x']\n")
+        for i in (1, 2):
+            with open(os.path.join(self.tempdir, '_cprof_m%d.py' % i), 'w') as f:
+                f.write(src.format(i))
+        sys.path.insert(0, self.tempdir)
+        try:
+            m1 = importlib.import_module('_cprof_m1')
+            m2 = importlib.import_module('_cprof_m2')
+        finally:
+            sys.path.remove(self.tempdir)
+
+        p = om.Problem()
+        p.model.add_subsystem('C1', m1.Comp())
+        p.model.add_subsystem('C2', m2.Comp())
+        p.setup()
+
+        prof = cProfile.Profile()
+        prof.enable()
+        p.run_model()
+        prof.disable()
+
+        rows = sorted(row[:3] for row in get_class_method_stats(pstats.Stats(prof))
+                      if row[0].endswith('.Comp'))
+        self.assertEqual(rows, [('_cprof_m1.Comp', 'compute', 1),
+                                ('_cprof_m2.Comp', 'compute', 1)])
+
+    def test_profile_parallel_args(self):
+        from om_devtools.cprof import profile_parallel
+
+        script = os.path.join(self.tempdir, 'argscript.py')
+        with open(script, 'w') as f:
+            f.write("import sys\n"
+                    "with open(sys.argv[1] + '.' + sys.argv[2], 'w') as f:\n"
+                    "    f.write('done')\n")
+        argfile = os.path.join(self.tempdir, 'args')
+
+        stats = profile_parallel([script], os.path.join(self.tempdir, 'prof.out'),
+                                 os.path.join(self.tempdir, 'profiles'), jobs=2,
+                                 stream=io.StringIO(), user_args=[argfile, 'x'])
+        self.assertIsNotNone(stats)
+        self.assertTrue(os.path.isfile(argfile + '.x'))
+
+    def test_expand_test_specs(self):
+        from om_devtools.cprof import expand_test_specs
+
+        tests = {
+            'test_a.py': ("import unittest\n\n"
+                          "class ACase(unittest.TestCase):\n"
+                          "    def test_one(self):\n        pass\n\n"
+                          "    def test_two(self):\n        pass\n\n"
+                          "    def helper(self):\n        pass\n\n"
+                          "def test_func():\n    pass\n"),
+            'test_b.py': ("import unittest\n\n"
+                          "class BCase(unittest.TestCase):\n"
+                          "    def test_x(self):\n        pass\n"),
+            'other.py': "def test_other():\n    pass\n",
+        }
+        for fname, src in tests.items():
+            with open(os.path.join(self.tempdir, fname), 'w') as f:
+                f.write(src)
+
+        a = os.path.join(self.tempdir, 'test_a.py')
+        b = os.path.join(self.tempdir, 'test_b.py')
+        pattern = os.path.join(self.tempdir, 'test_*.py')
+        specs = expand_test_specs([pattern + ':*Case.test_*', pattern + ':test_f*', 'foo.py',
+                                   'bar.py:Case.test'])
+        self.assertEqual(specs, [
+            a + ':ACase.test_one',
+            a + ':ACase.test_two',
+            b + ':BCase.test_x',
+            a + ':test_func',
+            'foo.py',
+            'bar.py:Case.test',
+        ])
+
+    def test_view_data(self):
+        from om_devtools.statprof.viewcprof import _load_cprof_data
+
+        fname = self._make_profiles([1000])[0]
+        data = _load_cprof_data(fname)
+        self.assertTrue(os.path.isfile(fname + '.viewcache'))
+
+        busy = [i for i, n in enumerate(data['names']) if n.endswith('(_busy)')][0]
+        self.assertEqual(data['cols']['ncalls'][busy], 1)
+        # _busy was called once, from _busy_outer
+        self.assertEqual(len(data['callers'][busy]), 1)
+        caller = data['callers'][busy][0][0]
+        self.assertTrue(data['names'][caller].endswith('(_busy_outer)'))
+        self.assertIn(busy, [c[0] for c in data['callees'][caller]])
+
+        # second load comes from the cache
+        self.assertEqual(_load_cprof_data(fname)['names'], data['names'])
+
+
+class NotebookUtilsTestCase(unittest.TestCase):
+    def test_run_notebooks_parallel(self):
+        from om_devtools.notebook_utils import run_notebooks_parallel
+
+        # each notebook runs in its own directory, so they can't clobber each other's files
+        src = "import os\nopen('out.txt', 'w').write('{0}')\nprint(open('out.txt').read())\n"
+        notebooks = [('nb%d.ipynb' % i, src.format(i)) for i in range(4)]
+        notebooks.append(('bad.ipynb', "raise RuntimeError('boom')\n"))
+
+        out = io.StringIO()
+        err = io.StringIO()
+        codes = run_notebooks_parallel(notebooks, 3, show_src=False, outstream=out,
+                                       errstream=err)
+        self.assertEqual(codes['bad.ipynb'], 1)
+        for i in range(4):
+            self.assertEqual(codes['nb%d.ipynb' % i], 0)
+            self.assertIn('running nb%d.ipynb  %s\n%s\n%d\n' % (i, '&' * 20, '-=' * 40, i),
+                          out.getvalue())
+        self.assertIn('RuntimeError: boom', err.getvalue())
+        self.assertFalse(os.path.exists('out.txt'))
+
+    def test_notebook_index(self):
+        import json
+        import tempfile
+        from om_devtools.notebook_utils import NotebookIndex, find_notebooks_iter, \
+            grep_notebooks
+
+        def _write_nb(fname, header, code):
+            with open(fname, 'w') as f:
+                json.dump({'cells': [
+                    {'cell_type': 'markdown', 'source': [header + '\n', 'some text\n']},
+                    {'cell_type': 'code', 'source': code, 'outputs': [],
+                     'execution_count': 1}]}, f)
+
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.chdir(tmpdir)
+            try:
+                _write_nb('a.ipynb', '# Section A', ['x = 1\n', '%matplotlib inline\n'])
+                _write_nb('b.ipynb', '# Section B', ['import ipyparallel\n'])
+                idxfile = os.path.join(tmpdir, 'index.cache')
+
+                index = NotebookIndex(idxfile)
+                self.assertEqual(list(find_notebooks_iter(section='Section A', index=index)),
+                                 ['./a.ipynb'])
+                self.assertEqual(sorted(find_notebooks_iter(string='some text', index=index)),
+                                 ['./a.ipynb', './b.ipynb'])
+                self.assertTrue(index.get('b.ipynb')['parallel'])
+                self.assertEqual(index.get('a.ipynb')['src'],
+                                 'x = 1\npass # %matplotlib inline')
+                index.save()
+
+                # a later session reuses saved entries and reindexes changed notebooks
+                _write_nb('b.ipynb', '# Section C', ['y = 2\n'])
+                index = NotebookIndex(idxfile)
+                self.assertEqual(len(index.entries), 2)
+                self.assertEqual(list(grep_notebooks(greps=['y = 2'], index=index)),
+                                 [('./b.ipynb', 'y = 2')])
+                self.assertFalse(index.get('b.ipynb')['parallel'])
+
+                os.remove('a.ipynb')
+                index.save()
+                self.assertEqual(list(NotebookIndex(idxfile).entries),
+                                 [os.path.abspath('b.ipynb')])
+            finally:
+                os.chdir(cwd)
+
+    def test_run_cache(self):
+        import tempfile
+        from om_devtools.notebook_utils import NotebookRunCache, run_notebook_src
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            nb = os.path.join(tmpdir, 'a.ipynb')
+            open(nb, 'w').close()
+            cachefile = os.path.join(tmpdir, 'runs.cache')
+            cache = NotebookRunCache(cachefile)
+            out = io.StringIO()
+            src = "print('hi')"
+            self.assertEqual(run_notebook_src(nb, src, outstream=out, errstream=out,
+                                              cache=cache), 0)
+            cache.save()
+
+            cache = NotebookRunCache(cachefile)
+            entry = cache.get_passed(nb, src, 1)
+            self.assertEqual(entry['stdout'], 'hi\n')
+            self.assertTrue(entry['runtime'] > 0.)
+            self.assertIsNone(cache.get_passed(nb, src + '\nx = 1', 1))
+            self.assertIsNone(cache.get_passed(nb, src, 4))
+
+            # failed runs are never skipped
+            src = "raise RuntimeError('boom')"
+            run_notebook_src(nb, src, outstream=out, errstream=out, cache=cache)
+            self.assertIsNone(cache.get_passed(nb, src, 1))
+            self.assertEqual(cache.entries[os.path.abspath(nb)]['returncode'], 1)
+
+    def test_core_scheduler(self):
+        import threading
+        import time
+        from om_devtools.notebook_utils import _CoreScheduler
+
+        sched = _CoreScheduler(4)
+        in_use = []
+        peak = []
+        lock = threading.Lock()
+
+        def _job(n):
+            with sched.reserve(n):
+                with lock:
+                    in_use.append(min(n, 4))
+                    peak.append(sum(in_use))
+                time.sleep(.05)
+                with lock:
+                    in_use.remove(min(n, 4))
+
+        threads = [threading.Thread(target=_job, args=(n,)) for n in (3, 3, 2, 1, 1, 8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(peak), 6)
+        self.assertLessEqual(max(peak), 4)
 
 
 if __name__ == "__main__":
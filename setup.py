@@ -28,6 +28,9 @@ setup_args = {
         'openmdao_command': [
             'dist_idxs=om_devtools.dist_idxs:_dist_idxs_setup',
             'memtop=om_devtools.memtop:_memtop_setup',
+            'memreport=om_devtools.memreport:_memreport_setup',
+            'systimes=om_devtools.systimes:_systimes_setup',
+            'argtypes=om_devtools.performance:_argtypes_setup',
             'cprof=om_devtools.cprof:_cprof_setup',
             'statprof=om_devtools.statprof.viewstatprof:_statprof_setup',
             'run_notebook=om_devtools.notebook_utils:_run_notebook_setup',